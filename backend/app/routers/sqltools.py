@@ -23,6 +23,7 @@ except Exception:  # pragma: no cover - fallback path for local runs
         from sql_tools import transpile_sql, lint_sql  # type: ignore
 
 
+# transpile_sql/lint_sql memoize their own results
 router = APIRouter(prefix="/sql", tags=["sql"])
 
 
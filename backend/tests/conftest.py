@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+import os
+import sys
+
+# Tests for the repo-level packages (ingestion, utils, llm) import them from the repo root
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
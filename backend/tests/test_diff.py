@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import pytest
+
+from utils import diff
+
+OLD = "def f(x):\n    return x\n\nprint(f(1))\nprint('done')\n"
+NEW = "def f(x):\n    return x * 2\n\nprint(f(1))\nprint(f(2))\nprint('done')"
+
+
+def test_side_by_side_dmp_matches_sequence_matcher(monkeypatch):
+    pytest.importorskip("diff_match_patch")
+    fast = diff.side_by_side(OLD, NEW)
+    monkeypatch.setattr(diff, "diff_match_patch", None)
+    assert diff.side_by_side(OLD, NEW) == fast
+    left, right, left_styles, right_styles = fast
+    assert left[1] == "-     return x" and right[1] == "+     return x * 2"
+    assert left_styles[0] is None and right_styles[4] == "add"
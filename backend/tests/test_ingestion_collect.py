@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+collect = importlib.import_module("ingestion.01_collect")
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _feed_in_chunks(data: bytes, size: int = 7):
+    """Feed ``data`` like discover_urls_via_sitemaps does; return (entries, stream)."""
+    stream = collect._SitemapStream()
+    entries = []
+    try:
+        for i in range(0, len(data), size):
+            entries.extend(stream.feed(data[i : i + size]))
+        entries.extend(stream.feed(None))
+    except collect._XML_PARSE_ERRORS:
+        pass
+    return entries, stream
+
+
+def test_sitemap_stream_urlset():
+    data = (
+        f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>'
+        "<url><loc> https://docs.example.com/a </loc><lastmod>2024-01-01</lastmod></url>"
+        "<url><!-- note --><loc>https://docs.example.com/b</loc></url>"
+        "</urlset>"
+    ).encode()
+    entries, stream = _feed_in_chunks(data)
+    assert entries == [("url", "https://docs.example.com/a"), ("url", "https://docs.example.com/b")]
+    # Yielded entries are detached so the tree does not grow with the sitemap
+    assert len(stream._root) == 0
+
+
+def test_sitemap_stream_sitemapindex_without_namespace():
+    data = (
+        "<sitemapindex>"
+        "<sitemap><loc>https://docs.example.com/s1.xml</loc></sitemap>"
+        "<sitemap><loc>https://docs.example.com/s2.xml</loc></sitemap>"
+        "</sitemapindex>"
+    ).encode()
+    entries, _ = _feed_in_chunks(data, size=5)
+    assert entries == [
+        ("sitemap", "https://docs.example.com/s1.xml"),
+        ("sitemap", "https://docs.example.com/s2.xml"),
+    ]
+
+
+def test_sitemap_stream_truncated_keeps_complete_entries():
+    data = (
+        f"<urlset {NS}>"
+        "<url><loc>https://docs.example.com/a</loc></url>"
+        "<url><loc>https://docs.example.com/b</loc></url>"
+        "<url><loc>https://docs.example.com/c"
+    ).encode()
+    entries, _ = _feed_in_chunks(data)
+    # Entries completed before the cut survive; lxml's recover mode may also
+    # close and return the cut-off last entry, ElementTree raises instead
+    assert entries[:2] == [("url", "https://docs.example.com/a"), ("url", "https://docs.example.com/b")]
+    assert len(entries) <= 3
+
+
+class _FakeClock:
+    """Monotonic clock that only advances when the code under test sleeps."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.now += delay
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _FakeClock()
+    # Swap only 01_collect's module references; the event loop keeps the real clock
+    monkeypatch.setattr(collect, "time", SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(collect, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=fake.sleep))
+    return fake
+
+
+def _grant_times(limiter, clock, n: int) -> list[float]:
+    async def run() -> list[float]:
+        times = []
+        for _ in range(n):
+            await limiter.wait()
+            times.append(clock.now)
+        return times
+
+    return asyncio.run(run())
+
+
+def test_rate_limiter_sustains_rps_after_burst(clock):
+    limiter = collect.RateLimiter(2.0)
+    times = _grant_times(limiter, clock, 6)
+    # Full bucket of ceil(rps) = 2 up front, then one token every 1/rps seconds
+    assert times == pytest.approx([0.0, 0.0, 0.5, 1.0, 1.5, 2.0])
+
+
+def test_rate_limiter_burst_capacity_refills_after_idle(clock):
+    limiter = collect.RateLimiter(3.5)
+    assert limiter.capacity == 4
+    assert _grant_times(limiter, clock, 4) == pytest.approx([0.0] * 4)
+    clock.now += 10.0  # idle long enough to refill, but never beyond capacity
+    times = _grant_times(limiter, clock, 5)
+    assert times[:4] == pytest.approx([10.0] * 4)
+    assert times[4] == pytest.approx(10.0 + 1 / 3.5)
+
+
+def test_rate_limiter_retry_after_blocks_until_delay(clock):
+    limiter = collect.RateLimiter(2.0)
+    limiter.push_delay(5.0)
+    limiter.push_delay(1.0)  # a shorter delay never shortens the hold
+    [granted] = _grant_times(limiter, clock, 1)
+    assert granted >= 5.0
+    # The bucket restarts empty when the hold ends
+    assert granted == pytest.approx(5.5)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from ingestion.utils_extract import _collapse_blank_lines, _postprocess_markdown
+
+
+def test_postprocess_normalizes_crlf_and_cr():
+    assert _postprocess_markdown("a\r\nb\rc\r\n") == "a\nb\nc"
+
+
+def test_postprocess_caps_blank_runs_at_two():
+    assert _postprocess_markdown("\n\na  \n\n\n\n\nb\n\n\n") == "a\n\n\nb"
+
+
+def test_postprocess_keeps_form_feed_inside_line():
+    # Only "\n" (after CR normalization) separates lines
+    assert _postprocess_markdown("a\x0cb\n\n\n\n\nc  ") == "a\x0cb\n\n\nc"
+
+
+def test_postprocess_fast_path_matches_full_pass():
+    # Inputs that are already clean take the fast path; it must agree with the full pass
+    samples = [
+        "a\x0cb\nc",
+        "# Title\n\nBody\n\n\n  indented\n- item",
+        "\n\n\nlead and trail\n\n",
+        "  first line indented\nsecond",
+        "x y\n\x85z",
+    ]
+    for text in samples:
+        assert _postprocess_markdown(text) == _collapse_blank_lines(text)
+    # A trailing space only changes which path runs, not how lines are split
+    assert _postprocess_markdown("a\x0cb\nc ") == _postprocess_markdown("a\x0cb\nc") == "a\x0cb\nc"
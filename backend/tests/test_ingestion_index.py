@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import importlib
+import struct
+
+index = importlib.import_module("ingestion.05_index")
+
+
+def test_vector_binary_matches_pgvector_send_format():
+    # int16 dim, int16 unused, then float4 values, all big-endian
+    assert index._vector_binary([1.5, -2.0]) == bytes.fromhex("0002 0000 3fc00000 c0000000")
+
+
+def test_copy_payload_layout():
+    record = {
+        "id": "00000000-0000-0000-0000-000000000001",
+        "url": "https://docs.example.com/a",
+        "title": None,
+        "product": "dbt",
+        "doc_type": None,
+        "version": "1.8",
+        "updated_at": "2026-01-01T00:00:00+00:00",
+        "h_path": "H1:",
+        "content_md": "é",
+        "embedding": [1.5, -2.0],
+    }
+    payload = index._copy_payload([record])
+
+    # Signature, flags and header-extension length
+    assert payload[:11] == b"PGCOPY\n\xff\r\n\x00"
+    assert struct.unpack(">ii", payload[11:19]) == (0, 0)
+    # File trailer
+    assert payload[-2:] == b"\xff\xff"
+
+    body = payload[19:-2]
+    (field_count,) = struct.unpack(">h", body[:2])
+    assert field_count == len(index.COLUMNS) + 1
+
+    fields = []
+    pos = 2
+    for _ in range(field_count):
+        (length,) = struct.unpack(">i", body[pos : pos + 4])
+        pos += 4
+        if length == -1:
+            fields.append(None)
+        else:
+            fields.append(body[pos : pos + length])
+            pos += length
+    assert pos == len(body)
+
+    expected = [None if record[c] is None else str(record[c]).encode("utf-8") for c in index.COLUMNS]
+    assert fields[:-1] == expected
+    assert fields[2] is None and fields[4] is None
+    assert fields[-1] == index._vector_binary([1.5, -2.0])
+
+
+def test_copy_payload_null_embedding_and_empty_batch():
+    payload = index._copy_payload([{"id": "x"}])
+    assert payload.endswith(struct.pack(">i", -1) + b"\xff\xff")
+    assert index._copy_payload([]) == index._COPY_HEADER + index._COPY_TRAILER
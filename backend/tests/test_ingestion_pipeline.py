@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import orjson
+
+from ingestion.pipeline import EMBED_DIM, chunk_record, clean_chunk_embed, clean_record
+
+RAW = {
+    "url": "https://docs.example.com/guide",
+    "title": "Guide",
+    "product": "snowflake",
+    "version": "latest",
+    "content": "# Guide\n\nBody text.",
+}
+
+
+def test_clean_and_chunk_record_fields():
+    normalized = clean_record(RAW)
+    assert normalized["content_md"] == RAW["content"]
+
+    [chunk] = chunk_record(normalized, "2026-01-01T00:00:00+00:00")
+    assert chunk["url"] == RAW["url"]
+    assert chunk["title"] == "Guide"
+    assert chunk["product"] == "snowflake"
+    assert chunk["version"] == "latest"
+    assert chunk["updated_at"] == "2026-01-01T00:00:00+00:00"
+    assert chunk["h_path"] == "H1:"
+    assert chunk["content_md"] == RAW["content"]
+    assert chunk["id"]
+
+
+def test_chunk_record_defaults_updated_at():
+    [chunk] = chunk_record(clean_record(RAW))
+    assert chunk["updated_at"]
+
+
+def test_clean_chunk_embed_writes_embedded_jsonl(tmp_path):
+    raw_path = tmp_path / "snowflake.jsonl"
+    raw_path.write_bytes(orjson.dumps(RAW) + b"\n" + orjson.dumps({**RAW, "url": RAW["url"] + "/2"}) + b"\n")
+    out_path = tmp_path / "snowflake.embedded.jsonl"
+
+    assert clean_chunk_embed(raw_path, out_path, "2026-01-01T00:00:00+00:00") == 2
+
+    records = [orjson.loads(line) for line in out_path.read_bytes().splitlines()]
+    assert [r["url"] for r in records] == [RAW["url"], RAW["url"] + "/2"]
+    assert {r["updated_at"] for r in records} == {"2026-01-01T00:00:00+00:00"}
+    assert all(len(r["embedding"]) == EMBED_DIM for r in records)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+import llm
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(llm, "time", SimpleNamespace(monotonic=lambda: fake.now))
+    return fake
+
+
+def test_delta_batcher_flushes_on_size(clock):
+    out: list[str] = []
+    batcher = llm._DeltaBatcher(out.append, max_chars=8, max_ms=20)
+    for delta in ("abc", "def"):
+        batcher.feed(delta)
+    assert out == []
+    batcher.feed("gh")  # reaches 8 chars
+    assert out == ["abcdefgh"]
+
+
+def test_delta_batcher_flushes_on_time(clock):
+    out: list[str] = []
+    batcher = llm._DeltaBatcher(out.append, max_chars=64, max_ms=20)
+    batcher.feed("a")
+    clock.now += 0.010
+    batcher.feed("b")
+    assert out == []
+    clock.now += 0.015  # 25 ms since the last flush
+    batcher.feed("c")
+    assert out == ["abc"]
+
+
+def test_delta_batcher_final_flush_sends_remainder(clock):
+    out: list[str] = []
+    batcher = llm._DeltaBatcher(out.append, max_chars=64, max_ms=20)
+    batcher.feed("tail")
+    batcher.flush()
+    batcher.flush()  # nothing pending: no empty delta
+    assert out == ["tail"]
+
+
+def test_history_messages_reuses_cache_when_history_grows(monkeypatch):
+    model = llm.LLM.__new__(llm.LLM)  # skip backend initialisation
+    model._history_cache = None
+    calls: list[dict] = []
+    normalize = llm._normalize_message
+
+    def counting_normalize(msg):
+        calls.append(msg)
+        return normalize(msg)
+
+    monkeypatch.setattr(llm, "_normalize_message", counting_normalize)
+
+    history = [{"role": "user", "content": "hi"}, {"role": " assistant ", "content": 42}]
+    first = model._history_messages(history)
+    assert first == [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "42"}]
+    assert len(calls) == 2
+
+    history.append({"role": "user", "content": "more"})
+    second = model._history_messages(history)
+    assert len(calls) == 3  # only the new entry is normalized
+    assert second[0] is first[0] and second[1] is first[1]
+    assert second[2] == {"role": "user", "content": "more"}
+
+    # A replaced entry (not the same dict) is normalized again from there on
+    history[1] = {"role": "assistant", "content": "edited"}
+    third = model._history_messages(history)
+    assert third[0] is first[0]
+    assert third[1] == {"role": "assistant", "content": "edited"}
+    assert len(calls) == 5
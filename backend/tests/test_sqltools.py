@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from app.routers.sqltools import sql_transpile, sql_lint
+from app.routers.sqltools import sql_transpile, sql_lint, transpile_sql
 from app.schemas import SQLTranspileRequest, SQLLintRequest
 
 
@@ -16,3 +16,10 @@ def test_lint_basic():
     assert "Suggested fix" in res.report or res.fixed
 
 
+def test_transpile_cached_repeat():
+    req = SQLTranspileRequest(sql="SELECT 2", source="snowflake", target="bigquery")
+    first = sql_transpile(req)
+    hits = transpile_sql.cache_info().hits
+    second = sql_transpile(req)
+    assert second.result == first.result
+    assert transpile_sql.cache_info().hits == hits + 1
@@ -3,18 +3,22 @@ Optional first-run model bootstrap:
 Downloads GGUF from an internal URL if missing and verifies SHA256.
 """
 from pathlib import Path
-import hashlib, shutil, urllib.request, json
+import hashlib, mmap, urllib.request, json
 
 APP_DIR = Path.home() / ".visionbi-ai" / "models"
 MODEL_PATH = APP_DIR / "model.gguf"
 MANIFEST_URL = "https://intra.vision.bi/models/visionbi-model.json"  # TODO: change to your internal URL
 
 def sha256sum(p: Path) -> str:
-    h = hashlib.sha256()
     with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        # Python < 3.11: hash the whole file through a single mmap view
+        h = hashlib.sha256()
+        if p.stat().st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        return h.hexdigest()
 
 def ensure_model() -> str:
     APP_DIR.mkdir(parents=True, exist_ok=True)
@@ -26,10 +30,17 @@ def ensure_model() -> str:
     url = m["url"]; expected = m["sha256"]
 
     tmp = MODEL_PATH.with_suffix(".part")
+    # Hash while streaming so the downloaded file is never re-read from disk
+    h = hashlib.sha256()
     with urllib.request.urlopen(url) as r, tmp.open("wb") as f:
-        shutil.copyfileobj(r, f)
-
-    actual = sha256sum(tmp)
+        while True:
+            buf = r.read(1 << 20)
+            if not buf:
+                break
+            f.write(buf)
+            h.update(buf)
+
+    actual = h.hexdigest()
     if actual.lower() != expected.lower():
         tmp.unlink(missing_ok=True)
         raise RuntimeError("Model checksum mismatch")
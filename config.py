@@ -1,16 +1,30 @@
+from functools import lru_cache
 from pathlib import Path
 import sys
 import os
 
+__all__ = [
+    "APP_NAME", "RESOURCES_DIR", "MODEL_FILENAME", "resource_path", "LLM_CONFIG",
+    "DEFAULT_SOURCE_DIALECT", "DEFAULT_TARGET_DIALECT", "DEFAULT_LINT_DIALECT",
+    "UI_DEFAULT_STREAM", "UI_LOGS_OPEN", "THEME", "UI_COMPACT_MODE",
+    "UI_USE_FLUENT", "UI_FRAMELESS", "UI_ACRYLIC", "UI_ENABLE_ANIMATIONS",
+    "ACCENT_COLOR", "NEUTRALS", "BORDER_RADIUS", "SPACING", "SPACING_HALF", "FONT_SIZES",
+]
+
 APP_NAME = "VisionBI-AI"
 RESOURCES_DIR = "Resources"
 MODEL_FILENAME = "model.gguf"  # replace if you ship a specific file name
 
+@lru_cache(maxsize=None)
 def resource_path(rel: str) -> str:
     """Return absolute path to resource, supporting PyInstaller (_MEIPASS)."""
     base = Path(getattr(sys, "_MEIPASS", Path(__file__).resolve().parent))
     return str((base / rel).resolve())
 
+def _env_flag(name: str, default: str) -> bool:
+    """Parse a boolean-ish environment variable once at import time."""
+    return str(os.getenv(name, default)).lower() in ("1", "true", "yes", "on")
+
 # Default LLM config
 LLM_CONFIG = {
     "model_path": resource_path(f"{RESOURCES_DIR}/{MODEL_FILENAME}"),
@@ -33,21 +47,22 @@ DEFAULT_LINT_DIALECT = "snowflake"
 
 # UI defaults (optional)
 # Whether to enable token streaming by default (if backend supports)
-UI_DEFAULT_STREAM = str(os.getenv("UI_DEFAULT_STREAM", "true")).lower() in ("1", "true", "yes", "on")
+UI_DEFAULT_STREAM = _env_flag("UI_DEFAULT_STREAM", "true")
 # Whether the Logs panel starts open
-UI_LOGS_OPEN = str(os.getenv("UI_LOGS_OPEN", "false")).lower() in ("1", "true", "yes", "on")
+UI_LOGS_OPEN = _env_flag("UI_LOGS_OPEN", "false")
 # Theme: light | dark
-THEME = str(os.getenv("THEME", "light")).lower() if str(os.getenv("THEME", "light")).lower() in ("light", "dark") else "light"
+_theme = str(os.getenv("THEME", "light")).lower()
+THEME = _theme if _theme in ("light", "dark") else "light"
 # UI Polish flags
-UI_COMPACT_MODE = str(os.getenv("UI_COMPACT_MODE", "false")).lower() in ("1", "true", "yes", "on")
+UI_COMPACT_MODE = _env_flag("UI_COMPACT_MODE", "false")
 
 # ------------------------------------------------------------------
 # Feature flags for upcoming UI work
 # ------------------------------------------------------------------
-UI_USE_FLUENT = str(os.getenv("UI_USE_FLUENT", "true")).lower() in ("1", "true", "yes", "on")
-UI_FRAMELESS = str(os.getenv("UI_FRAMELESS", "true")).lower() in ("1", "true", "yes", "on")
-UI_ACRYLIC = str(os.getenv("UI_ACRYLIC", "true")).lower() in ("1", "true", "yes", "on")
-UI_ENABLE_ANIMATIONS = str(os.getenv("UI_ENABLE_ANIMATIONS", "true")).lower() in ("1", "true", "yes", "on")
+UI_USE_FLUENT = _env_flag("UI_USE_FLUENT", "true")
+UI_FRAMELESS = _env_flag("UI_FRAMELESS", "true")
+UI_ACRYLIC = _env_flag("UI_ACRYLIC", "true")
+UI_ENABLE_ANIMATIONS = _env_flag("UI_ENABLE_ANIMATIONS", "true")
 
 # ------------------------------------------------------------------
 # Design tokens
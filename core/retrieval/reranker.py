@@ -11,11 +11,11 @@ from .retriever import RetrievedChunk
 
 
 def rerank(query: str, candidates: List[RetrievedChunk], k: int = 5) -> List[RetrievedChunk]:
-    q_terms = set(t.lower() for t in query.split())
+    q_terms = frozenset(query.lower().split())
     def score(c: RetrievedChunk) -> float:
         text = (c.title or "") + "\n" + (c.content_md or "")
-        terms = set(text.lower().split())
-        overlap = len(q_terms & terms)
+        # Probe the small query set per token instead of materializing the candidate's vocabulary
+        overlap = len(q_terms.intersection(text.lower().split()))
         return overlap + 0.001 * len((c.title or ""))
 
     ranked = sorted(candidates, key=score, reverse=True)
@@ -8,6 +8,7 @@ If DB is not Postgres with pgvector, falls back to lexical only.
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Optional
 import os
 
@@ -25,44 +26,57 @@ class RetrievedChunk:
     score: float
 
 
+# Statements are built once so SQLAlchemy's compiled cache on the shared engine is hit
+_LEX_SQL = text(
+    """
+SELECT id::text, url, title, product, content_md,
+       ts_rank(tsv, query) AS score
+FROM rag_chunks, plainto_tsquery('english', :q) AS query
+WHERE tsv @@ query
+ORDER BY score DESC
+LIMIT :limit
+    """
+)
+
+# Compare as fp16 halfvec so the ANN expression index from 05_index.py (HNSW or vchordrq) is used
+_VEC_SQL = text(
+    """
+SELECT id::text, url, title, product, content_md,
+       1 - (embedding::halfvec(1024) <=> CAST(:emb AS halfvec(1024))) AS score
+FROM rag_chunks
+ORDER BY embedding::halfvec(1024) <=> CAST(:emb AS halfvec(1024)) ASC
+LIMIT :limit
+    """
+)
+
+
 def _get_engine():
-    db_url = os.getenv("DATABASE_URL", "")
+    return _engine_for(os.getenv("DATABASE_URL", ""))
+
+
+@lru_cache(maxsize=4)
+def _engine_for(db_url: str):
+    # One engine per URL keeps the connection pool and statement cache warm across searches
     if not db_url:
         return None
     try:
-        return create_engine(db_url)
+        return create_engine(db_url, pool_pre_ping=True)
     except Exception:
         return None
 
 
-def _lexical(engine, query: str, limit: int) -> List[RetrievedChunk]:
-    sql = text(
-        """
-SELECT id::text, url, title, product, content_md,
-       ts_rank(to_tsvector('english', content_md), plainto_tsquery('english', :q)) AS score
-FROM rag_chunks
-WHERE to_tsvector('english', content_md) @@ plainto_tsquery('english', :q)
-ORDER BY score DESC
-LIMIT :limit
-        """
-    )
-    with engine.begin() as conn:
-        rows = conn.execute(sql, {"q": query, "limit": limit}).mappings().all()
+def _lexical(conn, query: str, limit: int) -> List[RetrievedChunk]:
+    rows = conn.execute(_LEX_SQL, {"q": query, "limit": limit}).mappings().all()
     return [RetrievedChunk(**row) for row in rows]
 
 
-def _vector(engine, embedding: list[float], limit: int) -> List[RetrievedChunk]:
-    sql = text(
-        """
-SELECT id::text, url, title, product, content_md,
-       1 - (embedding <=> :emb) AS score
-FROM rag_chunks
-ORDER BY embedding <=> :emb ASC
-LIMIT :limit
-        """
-    )
-    with engine.begin() as conn:
-        rows = conn.execute(sql, {"emb": embedding, "limit": limit}).mappings().all()
+def _vector_literal(embedding: list[float]) -> str:
+    # pgvector text format; cast server-side instead of binding a float8[] element by element
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
+def _vector(conn, embedding: list[float], limit: int) -> List[RetrievedChunk]:
+    rows = conn.execute(_VEC_SQL, {"emb": _vector_literal(embedding), "limit": limit}).mappings().all()
     return [RetrievedChunk(**row) for row in rows]
 
 
@@ -83,12 +97,14 @@ def hybrid_search(query: str, top_k: int = 12) -> List[RetrievedChunk]:
         return []
 
     k_each = max(1, min(50, top_k))
-    lex = _lexical(engine, query, limit=k_each)
-    try:
-        emb = embed_query_stub(query)
-        vec = _vector(engine, emb, limit=k_each)
-    except Exception:
-        vec = []
+    # Both read-only queries share one pooled connection and skip BEGIN/COMMIT
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        lex = _lexical(conn, query, limit=k_each)
+        try:
+            emb = embed_query_stub(query)
+            vec = _vector(conn, emb, limit=k_each)
+        except Exception:
+            vec = []
 
     # Union by id, keep max score, bias to lexical
     combined: dict[str, RetrievedChunk] = {}
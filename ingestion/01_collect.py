@@ -2,27 +2,38 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
 import logging
+import math
 import os
 import re
 import sys
 import time
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from hashlib import sha256
+from array import array
+from hashlib import blake2b, sha256
+from itertools import islice
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urlsplit
 from xml.etree import ElementTree as ET
 
 import httpx
+import orjson
 
-from ingestion.utils_extract import extract_markdown
+try:  # libxml2-backed parser: faster with less allocator churn than stdlib ElementTree
+    import lxml.etree as LET
+except Exception:  # pragma: no cover - lxml optional
+    LET = None
+
+from ingestion.utils_extract import extract_markdown, parse_html
 from ingestion.utils_url import (
     canonicalize,
+    compile_url_filter,
+    dedup_key,
     domain_key,
-    is_allowed,
+    has_canonical_hint,
     normalize_url,
 )
 
@@ -77,43 +88,75 @@ def load_sources(path: str) -> List[SourceDomain]:
 
 
 class RateLimiter:
-    """Simple per-domain rate limiter respecting min interval between calls."""
+    """Per-domain token bucket: sustains ``rps`` with bursts up to ``ceil(rps)``.
+
+    The lock only guards the bucket arithmetic; waiters sleep outside it so
+    several requests to one domain can be in flight when ``rps`` allows it.
+    """
 
     def __init__(self, rps: float) -> None:
-        self.min_interval = 1.0 / rps if rps > 0 else 0.0
+        self.rps = rps
+        self.capacity = max(1, math.ceil(rps)) if rps > 0 else 1
         self._lock = asyncio.Lock()
-        self._last: float = 0.0
-        self._delay_extra: float = 0.0  # e.g., Retry-After pushes extra delay
+        self._tokens: float = float(self.capacity)
+        self._updated: float = time.monotonic()
+        self._not_before: float = 0.0  # e.g., Retry-After blocks the bucket until then
 
     async def wait(self) -> None:
-        async with self._lock:
-            now = time.monotonic()
-            target = self._last + self.min_interval + self._delay_extra
-            sleep_for = max(0.0, target - now)
-            if sleep_for > 0:
-                await asyncio.sleep(sleep_for)
-            self._last = time.monotonic()
-            # Reset extra delay after we honored it once
-            self._delay_extra = 0.0
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                if now < self._not_before:
+                    delay = self._not_before - now
+                elif self.rps <= 0:
+                    return
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rps)
+                    self._updated = now
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    delay = (1.0 - self._tokens) / self.rps
+            await asyncio.sleep(delay)
 
     def push_delay(self, seconds: float) -> None:
         if seconds > 0:
-            # Take the maximum with current pending extra delay
-            self._delay_extra = max(self._delay_extra, float(seconds))
+            # Empty the bucket and hold it until the delay has elapsed
+            until = time.monotonic() + float(seconds)
+            if until > self._not_before:
+                self._not_before = until
+                self._updated = until
+                self._tokens = 0.0
 
 
 class RobotsCache:
     """Cache of robots.txt per domain using urllib.robotparser-style semantics."""
 
-    def __init__(self) -> None:
+    def __init__(self, domains: Iterable[str] = ()) -> None:
         self._cache: Dict[str, Any] = {}
-        self._locks: Dict[str, asyncio.Lock] = {}
+        self._locks: Dict[str, asyncio.Lock] = {d: asyncio.Lock() for d in domains}
+        self._allow_all: Set[str] = set()
+
+    async def can_fetch(self, client: httpx.AsyncClient, url: str) -> bool:
+        """Return whether robots.txt permits fetching ``url``.
+
+        Domains whose robots.txt has no rules skip the per-URL rule walk.
+        """
+        rp = await self.get(client, url)
+        if domain_key(url) in self._allow_all:
+            return True
+        try:
+            return bool(rp.can_fetch(UserAgent, url))
+        except Exception:
+            return True
 
     async def get(self, client: httpx.AsyncClient, url: str) -> Any:
         key = domain_key(url)
         if key in self._cache:
             return self._cache[key]
-        lock = self._locks.setdefault(key, asyncio.Lock())
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
         async with lock:
             if key in self._cache:
                 return self._cache[key]
@@ -130,6 +173,8 @@ class RobotsCache:
                     rp.parse("")
             except Exception:
                 rp.parse("")
+            if not rp.entries and rp.default_entry is None and not rp.disallow_all:
+                self._allow_all.add(key)
             self._cache[key] = rp
             return rp
 
@@ -143,42 +188,51 @@ SITEMAP_NS = {
     "sm": "http://www.sitemaps.org/schemas/sitemap/0.9",
 }
 
-
-async def _fetch_text(client: httpx.AsyncClient, url: str, timeout: float) -> Optional[str]:
-    try:
-        r = await client.get(url, headers={"User-Agent": UserAgent}, timeout=timeout)
-        if r.status_code == 200:
-            return r.text
-        return None
-    except Exception:
-        return None
+_XML_PARSE_ERRORS: Tuple[type, ...] = (ET.ParseError,) if LET is None else (ET.ParseError, LET.XMLSyntaxError)
 
 
-def _iter_sitemap_urls(xml_text: str) -> Tuple[List[str], List[str]]:
-    """Parse a sitemap XML text and return (sitemaps, urls).
+class _SitemapStream:
+    """Incremental sitemap parser fed with raw response bytes."""
 
-    Supports both <sitemapindex> and <urlset> with or without namespaces.
-    """
-    sitemaps: List[str] = []
-    urls: List[str] = []
+    def __init__(self) -> None:
+        if LET is not None:
+            self._parser = LET.XMLPullParser(events=("start", "end"), huge_tree=True, recover=True)
+        else:
+            self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: Optional[Any] = None
 
-    try:
-        root = ET.fromstring(xml_text)
-    except ET.ParseError:
-        return (sitemaps, urls)
-
-    tag = root.tag.lower()
-    if tag.endswith("sitemapindex"):
-        for sm in root.findall(".//{*}sitemap"):
-            loc = sm.find("{*}loc")
-            if loc is not None and loc.text:
-                sitemaps.append(loc.text.strip())
-    elif tag.endswith("urlset"):
-        for url in root.findall(".//{*}url"):
-            loc = url.find("{*}loc")
-            if loc is not None and loc.text:
-                urls.append(loc.text.strip())
-    return (sitemaps, urls)
+    def feed(self, data: Optional[bytes]) -> Iterator[Tuple[str, str]]:
+        """Feed a chunk (``None`` at end of input) and yield completed entries."""
+        if data is None:
+            self._parser.close()
+        else:
+            self._parser.feed(data)
+        return self.iter_urls()
+
+    def iter_urls(self) -> Iterator[Tuple[str, str]]:
+        """Yield ("sitemap" | "url", loc) pairs completed so far.
+
+        Supports both <sitemapindex> and <urlset> with or without namespaces.
+        Each entry is detached from the tree once yielded, so memory stays flat
+        regardless of sitemap size.
+        """
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = elem
+                continue
+            kind = elem.tag.rpartition("}")[2].lower()
+            if kind not in ("sitemap", "url"):
+                continue
+            for child in elem:
+                # lxml exposes comments/PIs as children with non-str tags
+                if isinstance(child.tag, str) and child.tag.rpartition("}")[2].lower() == "loc" and child.text:
+                    yield (kind, child.text.strip())
+                    break
+            try:
+                self._root.remove(elem)
+            except (AttributeError, ValueError):
+                elem.clear()
 
 
 async def discover_urls_via_sitemaps(
@@ -193,12 +247,28 @@ async def discover_urls_via_sitemaps(
         if url in seen_xml:
             return
         seen_xml.add(url)
-        text = await _fetch_text(client, url, timeout)
-        if not text:
+        sub_sitemaps: List[str] = []
+
+        def _collect(entries: Iterator[Tuple[str, str]]) -> None:
+            for kind, loc in entries:
+                if kind == "sitemap":
+                    sub_sitemaps.append(loc)
+                else:
+                    found_urls.add(loc)
+
+        # Stream the body into an incremental parser instead of buffering the whole XML
+        stream = _SitemapStream()
+        try:
+            async with client.stream("GET", url, headers={"User-Agent": UserAgent}, timeout=timeout) as r:
+                if r.status_code != 200:
+                    return
+                async for chunk in r.aiter_bytes():
+                    _collect(stream.feed(chunk))
+            _collect(stream.feed(None))
+        except _XML_PARSE_ERRORS:
+            pass
+        except Exception:
             return
-        sub_sitemaps, urls = _iter_sitemap_urls(text)
-        for u in urls:
-            found_urls.add(u)
         for sm in sub_sitemaps:
             await _walk(sm, depth + 1)
 
@@ -225,88 +295,162 @@ def _read_existing_meta(meta_path: Path) -> Tuple[Set[str], Dict[str, Dict[str,
     seen_urls: Set[str] = set()
     url_to_record: Dict[str, Dict[str, Any]] = {}
     if meta_path.exists():
-        with meta_path.open("r", encoding="utf-8") as f:
+        with meta_path.open("rb") as f:
             for line in f:
-                line = line.strip()
-                if not line:
-                    continue
                 try:
-                    rec = json.loads(line)
+                    # Blank or truncated lines fail to decode and are skipped
+                    rec = orjson.loads(line)
                 except Exception:
                     continue
                 url = rec.get("url")
                 status = int(rec.get("status", 0))
                 if url and status == 200:
-                    n = normalize_url(url)
+                    n = dedup_key(url)
                     seen_urls.add(n)
                     url_to_record[n] = rec
                 # Track canonical URLs as well to dedup downstream
                 c = rec.get("canonical_url")
                 if c:
-                    seen_urls.add(normalize_url(c))
+                    seen_urls.add(dedup_key(c))
     return seen_urls, url_to_record
 
 
+_WORD_RE = re.compile(r"\w+")
+
+
+def _url_hash(url_key: str) -> int:
+    """64-bit fingerprint of a URL's dedup key, as stored in the resume sidecar."""
+    return int.from_bytes(blake2b(url_key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _seen_path(meta_path: Path) -> Path:
+    return meta_path.with_suffix(".seen.bin")
+
+
+def _read_seen_hashes(meta_path: Path) -> Set[int]:
+    """Load fingerprints of successfully fetched (and canonical) URLs for resume.
+
+    Reads the compact ``<product>.seen.bin`` sidecar. Meta logs written before
+    the sidecar existed are scanned once and the sidecar is created from them.
+    """
+    seen_path = _seen_path(meta_path)
+    if seen_path.exists():
+        data = seen_path.read_bytes()
+        fingerprints = array("Q")
+        # Ignore a torn trailing entry from an interrupted write
+        fingerprints.frombytes(data[: len(data) - len(data) % fingerprints.itemsize])
+        return set(fingerprints)
+    seen = {_url_hash(u) for u in _read_existing_meta(meta_path)[0]}
+    if seen:
+        seen_path.write_bytes(array("Q", sorted(seen)).tobytes())
+    return seen
+
+
 def _estimate_tokens(markdown: str) -> int:
-    # Heuristic: ~1 token per 4 chars or number of words, whichever larger
+    # Heuristic: ~1 token per 4 chars or number of words, whichever larger.
+    # Space count stands in for a word scan; the char estimate dominates on real pages.
     by_chars = max(1, len(markdown) // 4)
-    by_words = max(1, len(re.findall(r"\w+", markdown)))
+    by_words = markdown.count(" ") + 1
     return max(by_chars, by_words)
 
 
+def _has_fewer_words(markdown: str, limit: int) -> bool:
+    """Return True if ``markdown`` has fewer than ``limit`` words, stopping early."""
+    return sum(1 for _ in islice(_WORD_RE.finditer(markdown), limit)) < limit
+
+
 async def _fetch_with_retries(
     client: httpx.AsyncClient,
     url: str,
-    domain_sem: asyncio.Semaphore,
     rate_limiter: RateLimiter,
     timeout: float,
     max_attempts: int = 3,
-) -> Tuple[int, Optional[str], Optional[str], float, Optional[str]]:
-    """Return (status, final_url, html_text, elapsed_ms, error)."""
+    fetch_slots: Optional[asyncio.Semaphore] = None,
+) -> Tuple[int, Optional[str], Optional[bytes], Optional[str], float, Optional[str]]:
+    """Return (status, final_url, html_bytes, charset, elapsed_ms, error).
+
+    The body is returned undecoded alongside the charset declared in the
+    Content-Type header (None if absent) so extraction can decode it correctly.
+    ``fetch_slots`` is held only while a request is on the wire, never during
+    rate-limit waits or retry backoff.
+    """
 
     error: Optional[str] = None
     final_url: Optional[str] = None
-    html: Optional[str] = None
+    html_bytes: Optional[bytes] = None
     start = time.perf_counter()
     attempt = 0
     while attempt < max_attempts:
         attempt += 1
         await rate_limiter.wait()
-        async with domain_sem:
-            try:
+        try:
+            async with fetch_slots if fetch_slots is not None else nullcontext():
                 resp = await client.get(url, headers={"User-Agent": UserAgent}, timeout=timeout, follow_redirects=True)
-                final_url = str(resp.url)
-                status = resp.status_code
-                if status in (429, 503):
-                    # apply retry-after if present
-                    ra = resp.headers.get("Retry-After")
-                    if ra:
-                        try:
-                            delay = float(ra)
-                        except ValueError:
-                            delay = 0.0
-                        rate_limiter.push_delay(delay)
-                    # Backoff and retry
-                    await asyncio.sleep(0.5 * (2 ** (attempt - 1)))
-                    continue
-                if 200 <= status < 300:
-                    html = resp.text
-                    elapsed_ms = (time.perf_counter() - start) * 1000
-                    return status, final_url, html, elapsed_ms, None
-                if 500 <= status < 600:
-                    await asyncio.sleep(0.5 * (2 ** (attempt - 1)))
-                    continue
-                # Non-retryable status
-                elapsed_ms = (time.perf_counter() - start) * 1000
-                return status, final_url, None, elapsed_ms, f"http_status_{status}"
-            except httpx.RequestError as exc:
-                error = f"request_error: {exc.__class__.__name__}"
+            final_url = str(resp.url)
+            status = resp.status_code
+            if status in (429, 503):
+                # apply retry-after if present
+                ra = resp.headers.get("Retry-After")
+                if ra:
+                    try:
+                        delay = float(ra)
+                    except ValueError:
+                        delay = 0.0
+                    rate_limiter.push_delay(delay)
+                # Backoff and retry
                 await asyncio.sleep(0.5 * (2 ** (attempt - 1)))
-            except Exception as exc:  # pragma: no cover - unexpected
-                error = f"unexpected_error: {exc.__class__.__name__}"
+                continue
+            if 200 <= status < 300:
+                html_bytes = resp.content
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                return status, final_url, html_bytes, resp.charset_encoding, elapsed_ms, None
+            if 500 <= status < 600:
                 await asyncio.sleep(0.5 * (2 ** (attempt - 1)))
+                continue
+            # Non-retryable status
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            return status, final_url, None, None, elapsed_ms, f"http_status_{status}"
+        except httpx.RequestError as exc:
+            error = f"request_error: {exc.__class__.__name__}"
+            await asyncio.sleep(0.5 * (2 ** (attempt - 1)))
+        except Exception as exc:  # pragma: no cover - unexpected
+            error = f"unexpected_error: {exc.__class__.__name__}"
+            await asyncio.sleep(0.5 * (2 ** (attempt - 1)))
     elapsed_ms = (time.perf_counter() - start) * 1000
-    return 0, final_url, html, elapsed_ms, error or "max_retries_exceeded"
+    return 0, final_url, html_bytes, None, elapsed_ms, error or "max_retries_exceeded"
+
+
+META_FLUSH_EVERY = 64
+
+
+def _write_page(html_path: Path, html_bytes: bytes, md_path: Path, md_bytes: bytes) -> None:
+    html_path.write_bytes(html_bytes)
+    md_path.write_bytes(md_bytes)
+
+
+def _flush_all(*handles: Any) -> None:
+    for h in handles:
+        h.flush()
+
+
+async def _meta_writer(fh: Any, seen_fh: Any, queue: "asyncio.Queue[Optional[Tuple[bytes, bytes]]]") -> None:
+    """Drain (meta line, seen fingerprints) pairs into their files, flushing every few records.
+
+    A ``None`` sentinel stops the writer after a final flush.
+    """
+    count = 0
+    while True:
+        item = await queue.get()
+        if item is None:
+            break
+        line, fingerprints = item
+        fh.write(line)
+        if fingerprints:
+            seen_fh.write(fingerprints)
+        count += 1
+        if count % META_FLUSH_EVERY == 0:
+            await asyncio.to_thread(_flush_all, fh, seen_fh)
+    await asyncio.to_thread(_flush_all, fh, seen_fh)
 
 
 async def process_product(
@@ -318,7 +462,15 @@ async def process_product(
     max_urls: int,
     resume: bool,
     dry_run: bool,
+    fetch_slots: Optional[asyncio.Semaphore] = None,
 ) -> None:
+    """Crawl one product.
+
+    ``fetch_slots`` caps requests in flight across all products crawled
+    together; without it this product alone runs up to ``concurrency`` at a time.
+    """
+    if fetch_slots is None:
+        fetch_slots = asyncio.Semaphore(max(1, concurrency))
     raw_dir, md_dir, meta_dir = _ensure_dirs(out_dir, product.product)
     meta_path = meta_dir / f"{product.product}.jsonl"
 
@@ -333,16 +485,19 @@ async def process_product(
                     continue
                 discovered.add(line)
 
-    # Normalize & filter
+    # Normalize & filter (globs compiled once per product)
+    allowed = compile_url_filter(product.allow, product.deny)
     urls = []
-    seen_norm: Set[str] = set()
+    seen_keys: Set[str] = set()
     for u in discovered:
+        # Fetch the normalized URL (signature intact); dedup on its key
         n = normalize_url(u)
-        if n in seen_norm:
+        key = dedup_key(n)
+        if key in seen_keys:
             continue
-        if not is_allowed(n, product.allow, product.deny):
+        if not allowed(n):
             continue
-        seen_norm.add(n)
+        seen_keys.add(key)
         urls.append(n)
 
     if max_urls > 0:
@@ -354,53 +509,51 @@ async def process_product(
         return
 
     # Resumability: read existing successful URLs
-    seen_success, url_to_record = _read_existing_meta(meta_path)
-
-    # Rate limiters and robots per domain
-    per_domain_sem: Dict[str, asyncio.Semaphore] = {}
-    per_domain_rl: Dict[str, RateLimiter] = {}
-    robots_cache = RobotsCache()
+    seen_success = _read_seen_hashes(meta_path)
 
-    def get_sem(url: str) -> asyncio.Semaphore:
-        k = domain_key(url)
-        if k not in per_domain_sem:
-            # One at a time per domain for politeness
-            per_domain_sem[k] = asyncio.Semaphore(1)
-        return per_domain_sem[k]
+    # Rate limiters and robots locks per domain, built once so lookups don't allocate
+    domains = {domain_key(u) for u in urls}
+    per_domain_rl: Dict[str, RateLimiter] = {
+        d: RateLimiter(max(0.001, product.rate_limit_rps)) for d in domains
+    }
+    robots_cache = RobotsCache(domains)
 
     def get_rl(url: str) -> RateLimiter:
-        k = domain_key(url)
-        if k not in per_domain_rl:
-            per_domain_rl[k] = RateLimiter(max(0.001, product.rate_limit_rps))
-        return per_domain_rl[k]
+        return per_domain_rl[domain_key(url)]
 
     # Canonical dedup within this run and across previous runs
-    seen_canonical: Set[str] = set()
-    seen_canonical.update({normalize_url(u) for u in seen_success})
+    seen_canonical: Set[int] = set(seen_success)
 
     total = 0
     successes = 0
 
-    meta_fh = meta_path.open("a", encoding="utf-8")
-    meta_fh.flush()
+    # Failure records share the run start time; success records reformat at most once a second
+    run_started_iso = datetime.now(timezone.utc).isoformat()
+    fetched_at_cache = [time.monotonic(), run_started_iso]
 
-    overall_sem = asyncio.Semaphore(concurrency)
+    def fetched_at() -> str:
+        now = time.monotonic()
+        if now - fetched_at_cache[0] > 1.0:
+            fetched_at_cache[0] = now
+            fetched_at_cache[1] = datetime.now(timezone.utc).isoformat()
+        return fetched_at_cache[1]
+
+    meta_fh = meta_path.open("ab")
+    seen_fh = _seen_path(meta_path).open("ab")
+    meta_queue: "asyncio.Queue[Optional[Tuple[bytes, bytes]]]" = asyncio.Queue()
+    writer_task = asyncio.create_task(_meta_writer(meta_fh, seen_fh, meta_queue))
 
     async def worker(u: str) -> None:
         nonlocal successes, total
         total += 1
         # Resume skip by URL existence
-        if resume and normalize_url(u) in seen_success:
+        url_hash = _url_hash(dedup_key(u))
+        if resume and url_hash in seen_success:
             logging.info("product=%s status=%s size=%s ms=%s url=%s", product.product, "skip-resume", "-", "-", u)
             return
 
         # Robots check
-        rp = await robots_cache.get(client, u)
-        try:
-            can = rp.can_fetch(UserAgent, u)  # type: ignore[attr-defined]
-        except Exception:
-            can = True
-        if not can:
+        if not await robots_cache.can_fetch(client, u):
             record = {
                 "url": u,
                 "status": 0,
@@ -409,7 +562,7 @@ async def process_product(
                 "title": "",
                 "product": product.product,
                 "version": product.version_label,
-                "fetched_at": datetime.now(timezone.utc).isoformat(),
+                "fetched_at": run_started_iso,
                 "hash_html": None,
                 "hash_md": None,
                 "path_html": None,
@@ -417,18 +570,16 @@ async def process_product(
                 "content_tokens_est": 0,
                 "error": "robots-disallow",
             }
-            meta_fh.write(json.dumps(record, ensure_ascii=False) + "\n")
-            meta_fh.flush()
+            await meta_queue.put((orjson.dumps(record) + b"\n", b""))
             logging.info("product=%s status=%s size=%s ms=%s url=%s", product.product, 0, "-", "-", u)
             return
 
-        async with overall_sem:
-            status, final_url, html, elapsed_ms, error = await _fetch_with_retries(
-                client, u, get_sem(u), get_rl(u), timeout
-            )
-        size = len(html.encode("utf-8")) if html else 0
+        status, final_url, html_bytes, charset, elapsed_ms, error = await _fetch_with_retries(
+            client, u, get_rl(u), timeout, fetch_slots=fetch_slots
+        )
+        size = len(html_bytes) if html_bytes else 0
 
-        if status != 200 or not html:
+        if status != 200 or not html_bytes:
             record = {
                 "url": u,
                 "status": status,
@@ -437,7 +588,7 @@ async def process_product(
                 "title": "",
                 "product": product.product,
                 "version": product.version_label,
-                "fetched_at": datetime.now(timezone.utc).isoformat(),
+                "fetched_at": run_started_iso,
                 "hash_html": None,
                 "hash_md": None,
                 "path_html": None,
@@ -445,8 +596,7 @@ async def process_product(
                 "content_tokens_est": 0,
                 "error": error,
             }
-            meta_fh.write(json.dumps(record, ensure_ascii=False) + "\n")
-            meta_fh.flush()
+            await meta_queue.put((orjson.dumps(record) + b"\n", b""))
             logging.info(
                 "product=%s status=%s size=%d ms=%.0f url=%s",
                 product.product,
@@ -457,9 +607,13 @@ async def process_product(
             )
             return
 
+        # Parse once when a canonical hint makes a parse necessary; extraction reuses it
+        tree = parse_html(html_bytes, charset) if has_canonical_hint(html_bytes) else None
+
         # Dedup by canonical URL if present
-        canonical = canonicalize(final_url or u, html)
-        if canonical and normalize_url(canonical) in seen_canonical:
+        canonical = canonicalize(final_url or u, html_bytes, tree=tree)
+        canonical_hash = _url_hash(dedup_key(canonical)) if canonical else None
+        if canonical_hash is not None and canonical_hash in seen_canonical:
             logging.info(
                 "product=%s status=%s size=%d ms=%.0f url=%s",
                 product.product,
@@ -471,28 +625,26 @@ async def process_product(
             return
 
         # Extract Markdown and title
-        markdown, title = extract_markdown(html, final_url or u)
+        markdown, title = extract_markdown(html_bytes, final_url or u, tree=tree, encoding=charset)
 
         # Heuristic: skip index-only pages (few words, many links)
-        if markdown:
-            words = len(re.findall(r"\w+", markdown))
-            links = markdown.count("[")
-            if words < 60 and links > 10:
-                logging.info(
-                    "product=%s status=%s size=%d ms=%.0f url=%s",
-                    product.product,
-                    "skip-index-like",
-                    size,
-                    elapsed_ms,
-                    u,
-                )
-                return
+        # Cheap C-level link count first; the word scan stops after 60 matches
+        if markdown and markdown.count("[") > 10 and _has_fewer_words(markdown, 60):
+            logging.info(
+                "product=%s status=%s size=%d ms=%.0f url=%s",
+                product.product,
+                "skip-index-like",
+                size,
+                elapsed_ms,
+                u,
+            )
+            return
 
-        html_bytes = html.encode("utf-8")
         md_text = markdown or ""
+        md_bytes = md_text.encode("utf-8")
 
         hash_html = sha256(html_bytes).hexdigest()
-        hash_md = sha256(md_text.encode("utf-8")).hexdigest()
+        hash_md = sha256(md_bytes).hexdigest()
 
         html_path_rel = f"raw/{product.product}/{hash_html}.html"
         md_path_rel = f"md/{product.product}/{hash_md}.md"
@@ -510,8 +662,8 @@ async def process_product(
                 u,
             )
         else:
-            html_path.write_bytes(html_bytes)
-            md_path.write_text(md_text, encoding="utf-8")
+            # Disk writes run in a worker thread so they don't stall in-flight fetches
+            await asyncio.to_thread(_write_page, html_path, html_bytes, md_path, md_bytes)
 
         record = {
             "url": u,
@@ -521,18 +673,19 @@ async def process_product(
             "title": title,
             "product": product.product,
             "version": product.version_label,
-            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "fetched_at": fetched_at(),
             "hash_html": hash_html,
             "hash_md": hash_md,
             "path_html": html_path_rel,
             "path_md": md_path_rel,
             "content_tokens_est": _estimate_tokens(md_text),
         }
-        meta_fh.write(json.dumps(record, ensure_ascii=False) + "\n")
-        meta_fh.flush()
+        fingerprints = [url_hash]
+        if canonical_hash is not None:
+            fingerprints.append(canonical_hash)
+            seen_canonical.add(canonical_hash)
+        await meta_queue.put((orjson.dumps(record) + b"\n", array("Q", fingerprints).tobytes()))
         successes += 1
-        if canonical:
-            seen_canonical.add(normalize_url(canonical))
         logging.info(
             "product=%s status=%s size=%d ms=%.0f url=%s",
             product.product,
@@ -542,13 +695,34 @@ async def process_product(
             u,
         )
 
-    # Launch workers
-    tasks = [asyncio.create_task(worker(u)) for u in urls]
-    # Run with backpressure using overall_sem inside worker
-    if tasks:
-        await asyncio.gather(*tasks)
+    # Bounded producer/consumer: only `concurrency` worker tasks exist at any time
+    url_queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=max(1, concurrency) * 4)
 
-    meta_fh.close()
+    async def worker_loop() -> None:
+        while True:
+            u = await url_queue.get()
+            if u is None:
+                return
+            try:
+                await worker(u)
+            except Exception:
+                # Keep the pool alive so the producer never blocks on a full queue
+                logging.exception("product=%s status=%s url=%s", product.product, "worker-error", u)
+
+    workers = [asyncio.create_task(worker_loop()) for _ in range(max(1, concurrency))]
+    try:
+        for u in urls:
+            await url_queue.put(u)
+        for _ in workers:
+            await url_queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+        await meta_queue.put(None)
+        await writer_task
+        meta_fh.close()
+        seen_fh.close()
     logging.info(
         "product=%s status=summary total=%d success=%d", product.product, total, successes
     )
@@ -576,12 +750,21 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     )
     parser.add_argument("--max-urls", type=int, default=0, help="Max URLs per product (0 = no limit)")
     parser.add_argument("--timeout", type=float, default=20.0, help="Request timeout in seconds")
-    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent workers")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent fetches across all products")
     parser.add_argument("--resume", action="store_true", help="Skip URLs already processed successfully")
     parser.add_argument("--dry-run", action="store_true", help="List URLs only; do not fetch")
     return parser.parse_args(argv)
 
 
+def _http2_available() -> bool:
+    # httpx only speaks HTTP/2 when the optional `h2` package is installed
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
 async def amain(args: argparse.Namespace) -> None:
     logging.basicConfig(
         level=logging.INFO,
@@ -603,18 +786,30 @@ async def amain(args: argparse.Namespace) -> None:
     out_dir.mkdir(parents=True, exist_ok=True)
 
     timeout = httpx.Timeout(args.timeout)
-    async with httpx.AsyncClient(timeout=timeout, headers={"User-Agent": UserAgent}) as client:
-        for src in sources:
-            await process_product(
-                client=client,
-                out_dir=out_dir,
-                product=src,
-                timeout=args.timeout,
-                concurrency=args.concurrency,
-                max_urls=args.max_urls,
-                resume=bool(args.resume),
-                dry_run=bool(args.dry_run),
-            )
+    # Per-domain politeness is enforced by RateLimiter; keep the pool itself wide
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+    async with httpx.AsyncClient(
+        timeout=timeout, limits=limits, http2=_http2_available(), headers={"User-Agent": UserAgent}
+    ) as client:
+        # Products live on different hosts, so crawl them side by side; one
+        # semaphore keeps --concurrency a global cap on requests in flight
+        fetch_slots = asyncio.Semaphore(max(1, args.concurrency))
+        await asyncio.gather(
+            *[
+                process_product(
+                    client=client,
+                    out_dir=out_dir,
+                    product=src,
+                    timeout=args.timeout,
+                    concurrency=args.concurrency,
+                    max_urls=args.max_urls,
+                    resume=bool(args.resume),
+                    dry_run=bool(args.dry_run),
+                    fetch_slots=fetch_slots,
+                )
+                for src in sources
+            ]
+        )
 
 
 def main() -> None:
@@ -6,9 +6,15 @@ Convert raw JSONL to normalized markdown records.
 Phase 0 stub: pass through content as markdown; keep title and url.
 """
 
-import json
 from pathlib import Path
 
+import orjson
+
+try:
+    from ingestion.pipeline import clean_record, clear_outputs
+except ImportError:  # pragma: no cover - run as a plain script from ingestion/
+    from pipeline import clean_record, clear_outputs
+
 IN_DIR = Path(__file__).resolve().parents[0] / ".data" / "raw"
 OUT_DIR = Path(__file__).resolve().parents[0] / ".data" / "clean"
 
@@ -16,27 +22,14 @@ OUT_DIR = Path(__file__).resolve().parents[0] / ".data" / "clean"
 def main() -> None:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
     count = 0
-    # Clear previous outputs to be idempotent
-    for old in OUT_DIR.glob("*.norm.jsonl"):
-        try:
-            old.unlink()
-        except Exception:
-            pass
+    clear_outputs(OUT_DIR, "*.norm.jsonl")
 
     for path in sorted(IN_DIR.glob("*.jsonl")):
-        with open(path, "r", encoding="utf-8") as f:
+        out_path = OUT_DIR / (path.stem + ".norm.jsonl")
+        with open(path, "rb") as f, open(out_path, "wb") as out:
             for line in f:
-                obj = json.loads(line)
-                normalized = {
-                    "url": obj["url"],
-                    "title": obj.get("title"),
-                    "product": obj.get("product"),
-                    "version": obj.get("version"),
-                    "content_md": obj.get("content", ""),
-                }
-                out_path = OUT_DIR / (path.stem + ".norm.jsonl")
-                with open(out_path, "a", encoding="utf-8") as out:
-                    out.write(json.dumps(normalized) + "\n")
+                normalized = clean_record(orjson.loads(line))
+                out.write(orjson.dumps(normalized) + b"\n")
                 count += 1
     print(f"Cleaned {count} records into {OUT_DIR}")
 
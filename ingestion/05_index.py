@@ -7,10 +7,12 @@ Phase 0: create table if not exists (requires pgvector extension).
 If DATABASE_URL points to SQLite, this script will just print a message.
 """
 
-import json
+import io
 import os
+import struct
 from pathlib import Path
 
+import orjson
 from sqlalchemy import text
 from sqlalchemy.engine import create_engine
 
@@ -37,28 +39,103 @@ CREATE TABLE IF NOT EXISTS rag_chunks (
   embedding vector(1024)
 );
 
-CREATE INDEX IF NOT EXISTS rag_chunks_embedding_idx
-  ON rag_chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- retriever._vector orders by the halfvec expression; this plain ivfflat
+-- index on embedding can no longer serve it and only slows down writes
+DROP INDEX IF EXISTS rag_chunks_embedding_idx;
 
-CREATE INDEX IF NOT EXISTS rag_chunks_lexical_idx
-  ON rag_chunks USING gin (to_tsvector('english', content_md));
+-- Stored tsvector so lexical search never re-tokenizes content_md per query
+ALTER TABLE rag_chunks ADD COLUMN IF NOT EXISTS tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('english', coalesce(content_md, ''))) STORED;
+
+DROP INDEX IF EXISTS rag_chunks_lexical_idx;
+CREATE INDEX IF NOT EXISTS rag_chunks_tsv_idx
+  ON rag_chunks USING gin (tsv);
                 """
             )
         )
+    _ensure_ann_index(engine)
 
 
-def upsert_chunks(engine) -> int:
-    inserted = 0
-    for path in sorted(EMBED_DIR.glob("*.embedded.jsonl")):
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                obj = json.loads(line)
-                with engine.begin() as conn:
-                    conn.execute(
-                        text(
-                            """
+def _ensure_ann_index(engine) -> None:
+    """Keep exactly one ANN index on the halfvec expression used by retriever._vector.
+
+    With the vchord extension available this is a VectorChord IVF+RaBitQ index
+    and the HNSW index is dropped. Images without VectorChord (e.g. stock
+    pgvector/pgvector) get the fp16 HNSW index instead (pgvector >= 0.7).
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vchord CASCADE"))
+            conn.execute(
+                text(
+                    """
+CREATE INDEX IF NOT EXISTS rag_chunks_embedding_vchord_idx
+  ON rag_chunks USING vchordrq ((embedding::halfvec(1024)) halfvec_cosine_ops)
+  WITH (options = 'residual_quantization = true');
+
+DROP INDEX IF EXISTS rag_chunks_embedding_half_idx;
+                    """
+                )
+            )
+        return
+    except Exception as e:
+        print(f"VectorChord not available, using HNSW index: {e}")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+CREATE INDEX IF NOT EXISTS rag_chunks_embedding_half_idx
+  ON rag_chunks USING hnsw ((embedding::halfvec(1024)) halfvec_cosine_ops);
+                """
+            )
+        )
+
+
+UPSERT_SQL = text(
+    """
+INSERT INTO rag_chunks (id, url, title, product, doc_type, version, updated_at, h_path, content_md, embedding)
+VALUES (:id, :url, :title, :product, :doc_type, :version, :updated_at, :h_path, :content_md, CAST(:embedding AS vector))
+ON CONFLICT (id) DO UPDATE SET
+  url = EXCLUDED.url,
+  title = EXCLUDED.title,
+  product = EXCLUDED.product,
+  doc_type = EXCLUDED.doc_type,
+  version = EXCLUDED.version,
+  updated_at = EXCLUDED.updated_at,
+  h_path = EXCLUDED.h_path,
+  content_md = EXCLUDED.content_md,
+  embedding = EXCLUDED.embedding
+    """
+)
+
+# Staging table for binary COPY; text columns are cast on the INSERT ... SELECT
+STAGE_DDL = text(
+    """
+CREATE TEMP TABLE rag_chunks_stage (
+  id TEXT,
+  url TEXT,
+  title TEXT,
+  product TEXT,
+  doc_type TEXT,
+  version TEXT,
+  updated_at TEXT,
+  h_path TEXT,
+  content_md TEXT,
+  embedding vector(1024)
+) ON COMMIT DROP
+    """
+)
+
+STAGE_COPY_SQL = (
+    "COPY rag_chunks_stage (id, url, title, product, doc_type, version, updated_at, h_path, content_md, embedding) "
+    "FROM STDIN WITH (FORMAT BINARY)"
+)
+
+STAGE_MERGE_SQL = text(
+    """
 INSERT INTO rag_chunks (id, url, title, product, doc_type, version, updated_at, h_path, content_md, embedding)
-VALUES (:id, :url, :title, :product, :doc_type, :version, :updated_at, :h_path, :content_md, :embedding)
+SELECT id::uuid, url, title, product, doc_type, version, updated_at::timestamptz, h_path, content_md, embedding
+FROM rag_chunks_stage
 ON CONFLICT (id) DO UPDATE SET
   url = EXCLUDED.url,
   title = EXCLUDED.title,
@@ -69,22 +146,98 @@ ON CONFLICT (id) DO UPDATE SET
   h_path = EXCLUDED.h_path,
   content_md = EXCLUDED.content_md,
   embedding = EXCLUDED.embedding
-                            """
-                        ),
-                        {
-                            "id": obj["id"],
-                            "url": obj.get("url"),
-                            "title": obj.get("title"),
-                            "product": obj.get("product"),
-                            "doc_type": obj.get("doc_type"),
-                            "version": obj.get("version"),
-                            "updated_at": obj.get("updated_at"),
-                            "h_path": obj.get("h_path"),
-                            "content_md": obj.get("content_md"),
-                            "embedding": obj.get("embedding"),
-                        },
-                    )
-                    inserted += 1
+    """
+)
+
+COLUMNS = ("id", "url", "title", "product", "doc_type", "version", "updated_at", "h_path", "content_md")
+BATCH_SIZE = 500
+
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_COPY_TRAILER = struct.pack(">h", -1)
+_NULL_FIELD = struct.pack(">i", -1)
+
+
+def _vector_literal(embedding) -> str | None:
+    if embedding is None:
+        return None
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
+def _vector_binary(embedding) -> bytes:
+    """pgvector binary send format: int16 dim, int16 unused, dim x float4 (big-endian)."""
+    dim = len(embedding)
+    return struct.pack(f">HH{dim}f", dim, 0, *embedding)
+
+
+def _copy_field(value: bytes | None) -> bytes:
+    if value is None:
+        return _NULL_FIELD
+    return struct.pack(">i", len(value)) + value
+
+
+def _copy_payload(batch: list[dict]) -> bytes:
+    """Encode a batch of records as a PGCOPY binary stream for rag_chunks_stage."""
+    parts = [_COPY_HEADER]
+    field_count = struct.pack(">h", len(COLUMNS) + 1)
+    for obj in batch:
+        parts.append(field_count)
+        for col in COLUMNS:
+            value = obj.get(col)
+            parts.append(_copy_field(None if value is None else str(value).encode("utf-8")))
+        embedding = obj.get("embedding")
+        parts.append(_copy_field(None if embedding is None else _vector_binary(embedding)))
+    parts.append(_COPY_TRAILER)
+    return b"".join(parts)
+
+
+def _iter_batches():
+    batch: list[dict] = []
+    for path in sorted(EMBED_DIR.glob("*.embedded.jsonl")):
+        with open(path, "rb") as f:
+            for line in f:
+                batch.append(orjson.loads(line))
+                if len(batch) >= BATCH_SIZE:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def _upsert_batch_copy(conn, batch: list[dict]) -> None:
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(STAGE_COPY_SQL, io.BytesIO(_copy_payload(batch)))
+    finally:
+        cursor.close()
+    conn.execute(STAGE_MERGE_SQL)
+    conn.execute(text("TRUNCATE rag_chunks_stage"))
+
+
+def _upsert_batch_executemany(conn, batch: list[dict]) -> None:
+    params = [{col: obj.get(col) for col in COLUMNS} for obj in batch]
+    for row, obj in zip(params, batch):
+        row["embedding"] = _vector_literal(obj.get("embedding"))
+    conn.execute(UPSERT_SQL, params)
+
+
+def upsert_chunks(engine) -> int:
+    """Upsert all embedded chunks in one transaction.
+
+    On psycopg2 each batch is streamed with binary COPY into a temp staging
+    table and merged with INSERT ... SELECT ON CONFLICT; other drivers fall
+    back to batched executemany with text vector literals.
+    """
+    inserted = 0
+    use_copy = engine.dialect.driver == "psycopg2"
+    with engine.begin() as conn:
+        if use_copy:
+            conn.execute(STAGE_DDL)
+        for batch in _iter_batches():
+            if use_copy:
+                _upsert_batch_copy(conn, batch)
+            else:
+                _upsert_batch_executemany(conn, batch)
+            inserted += len(batch)
     return inserted
 
 
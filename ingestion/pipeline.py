@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+"""
+Fused clean → chunk → embed pass over raw JSONL.
+
+Each raw record is normalized, chunked and embedded in memory and written
+straight to `.data/embedded`, skipping the intermediate clean/chunk files.
+The per-stage scripts (02/03/04) reuse the same transforms when the
+intermediate outputs are wanted.
+"""
+
+import uuid
+from datetime import datetime, UTC
+from pathlib import Path
+
+import orjson
+
+EMBED_DIM = 1024
+DATA_DIR = Path(__file__).resolve().parents[0] / ".data"
+RAW_DIR = DATA_DIR / "raw"
+EMBED_DIR = DATA_DIR / "embedded"
+
+
+def clean_record(obj: dict) -> dict:
+    """Normalize a raw record (Phase 0: pass content through as markdown)."""
+    return {
+        "url": obj["url"],
+        "title": obj.get("title"),
+        "product": obj.get("product"),
+        "version": obj.get("version"),
+        "content_md": obj.get("content", ""),
+    }
+
+
+def chunk_record(obj: dict, updated_at: str | None = None) -> list[dict]:
+    """Split a normalized record into chunks (Phase 0: one chunk, trivial h_path).
+
+    Callers processing many records should pass a per-run ``updated_at``.
+    """
+    if updated_at is None:
+        updated_at = datetime.now(UTC).isoformat()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "url": obj["url"],
+            "title": obj.get("title"),
+            "product": obj.get("product"),
+            "doc_type": None,
+            "version": obj.get("version"),
+            "updated_at": updated_at,
+            "h_path": "H1:",
+            "breadcrumbs": [],
+            "content_md": obj.get("content_md", ""),
+            "codeblocks": [],
+        }
+    ]
+
+
+def embed_chunks(chunks: list[dict]) -> list[dict]:
+    """Attach embeddings to a batch of chunks (Phase 0: zero vectors)."""
+    return [{**chunk, "embedding": [0.0] * EMBED_DIM} for chunk in chunks]
+
+
+def clear_outputs(out_dir: Path, pattern: str) -> None:
+    """Delete previous stage outputs matching ``pattern`` in ``out_dir``.
+
+    Runs are idempotent and files for removed inputs do not linger.
+    """
+    for old in out_dir.glob(pattern):
+        try:
+            old.unlink()
+        except Exception:
+            pass
+
+
+def clean_chunk_embed(raw_path: Path, out_path: Path, updated_at: str | None = None) -> int:
+    """Run all three stages over one raw JSONL file; return chunks written."""
+    if updated_at is None:
+        updated_at = datetime.now(UTC).isoformat()
+    count = 0
+    with open(raw_path, "rb") as f, open(out_path, "wb") as out:
+        for line in f:
+            chunks = chunk_record(clean_record(orjson.loads(line)), updated_at)
+            for record in embed_chunks(chunks):
+                out.write(orjson.dumps(record) + b"\n")
+                count += 1
+    return count
+
+
+def main() -> None:
+    EMBED_DIR.mkdir(parents=True, exist_ok=True)
+    count = 0
+    clear_outputs(EMBED_DIR, "*.embedded.jsonl")
+
+    # All chunks in one run share updated_at
+    updated_at = datetime.now(UTC).isoformat()
+    for path in sorted(RAW_DIR.glob("*.jsonl")):
+        count += clean_chunk_embed(path, EMBED_DIR / (path.stem + ".embedded.jsonl"), updated_at)
+    print(f"Embedded {count} chunks into {EMBED_DIR}")
+
+
+if __name__ == "__main__":
+    main()
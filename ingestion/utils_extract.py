@@ -9,32 +9,112 @@ Strategy:
 
 from __future__ import annotations
 
-from typing import Tuple
+import io
+from functools import lru_cache
+from typing import Any, Tuple
+
+
+@lru_cache(maxsize=1)
+def _get_trafilatura() -> Any:
+    """Import trafilatura once; returns None when it isn't installed."""
+    try:
+        import trafilatura
+    except Exception:
+        return None
+    return trafilatura
+
+
+@lru_cache(maxsize=1)
+def _get_trafilatura_config() -> Any:
+    # use_config() re-reads the settings file on every call
+    trafilatura = _get_trafilatura()
+    return trafilatura.settings.use_config() if trafilatura is not None else None
+
+
+@lru_cache(maxsize=1)
+def _get_readability_stack() -> Tuple[Any, Any, Any] | None:
+    """Import (BeautifulSoup, readability.Document, markdownify) once."""
+    try:
+        from bs4 import BeautifulSoup
+        from markdownify import markdownify as md_convert
+        from readability import Document
+    except Exception:
+        return None
+    return BeautifulSoup, Document, md_convert
 
 
 def _postprocess_markdown(markdown: str) -> str:
-    # Normalize newlines and collapse >2 blank lines into max 2
-    lines = markdown.replace("\r\n", "\n").replace("\r", "\n").split("\n")
-    cleaned_lines: list[str] = []
+    if not markdown:
+        return ""
+    # Already clean (LF only, no blank run over 2, no trailing spaces): only trim
+    # the ends; the result equals _collapse_blank_lines(markdown)
+    if (
+        "\r" not in markdown
+        and "\n\n\n\n" not in markdown
+        and all(line == line.rstrip() for line in markdown.split("\n"))
+    ):
+        return markdown.strip()
+    return _collapse_blank_lines(markdown)
+
+
+def _collapse_blank_lines(markdown: str) -> str:
+    """Normalize newlines, strip trailing spaces and cap blank runs at 2."""
+    # Single pass over "\n"-separated lines (not splitlines(), which also breaks
+    # on form feeds, \x85, \u2028...); blank runs are emitted only before the
+    # next non-empty line (capped at 2), so edge blanks never appear
+    out = io.StringIO()
     blank_run = 0
-    for line in lines:
-        if line.strip() == "":
+    wrote = False
+    for line in markdown.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        if not line.strip():
             blank_run += 1
-            if blank_run <= 2:
-                cleaned_lines.append("")
-        else:
-            blank_run = 0
-            cleaned_lines.append(line.rstrip())
-    # Trim leading and trailing blank lines
-    while cleaned_lines and cleaned_lines[0] == "":
-        cleaned_lines.pop(0)
-    while cleaned_lines and cleaned_lines[-1] == "":
-        cleaned_lines.pop()
-    return "\n".join(cleaned_lines).strip()
-
-
-def extract_markdown(html: str, url: str) -> Tuple[str, str]:
-    """Extract Markdown and title from raw HTML.
+            continue
+        if wrote:
+            out.write("\n" * (1 + min(blank_run, 2)))
+        out.write(line.rstrip())
+        wrote = True
+        blank_run = 0
+    return out.getvalue().strip()
+
+
+@lru_cache(maxsize=16)
+def _html_parser(encoding: str) -> Any:
+    import lxml.html
+
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
+def parse_html(html: str | bytes, encoding: str | None = None) -> Any:
+    """Parse HTML once into an ``lxml.html`` tree for sharing across helpers.
+
+    ``encoding`` is the charset declared by the HTTP response for undecoded
+    bytes; without it lxml falls back to in-document declarations.
+
+    Returns None when the document cannot be parsed.
+    """
+
+    try:
+        import lxml.html
+
+        if encoding and isinstance(html, bytes):
+            try:
+                return lxml.html.fromstring(html, parser=_html_parser(encoding))
+            except LookupError:
+                pass  # Unknown charset name: let lxml detect it
+        return lxml.html.fromstring(html)
+    except Exception:
+        return None
+
+
+def extract_markdown(
+    html: str | bytes, url: str, tree: Any = None, encoding: str | None = None
+) -> Tuple[str, str]:
+    """Extract Markdown and title from raw HTML (text or undecoded bytes).
+
+    ``tree`` is an optional tree from :func:`parse_html`; when given, the
+    last-resort title lookup reuses it instead of parsing ``html`` again.
+    ``encoding`` is the charset declared by the HTTP response; bytes are
+    decoded with it, otherwise the extractors detect the charset themselves.
 
     Returns a tuple of (markdown, title).
     """
@@ -42,11 +122,18 @@ def extract_markdown(html: str, url: str) -> Tuple[str, str]:
     title: str = ""
     md: str | None = None
 
+    if encoding and isinstance(html, bytes):
+        try:
+            html = html.decode(encoding, errors="replace")
+        except LookupError:
+            pass  # Unknown charset name: hand the bytes over undecoded
+
     # Attempt trafilatura first
     try:
-        import trafilatura
-
-        tr_opts = trafilatura.settings.use_config()
+        trafilatura = _get_trafilatura()
+        if trafilatura is None:
+            raise ImportError("trafilatura")
+        tr_opts = _get_trafilatura_config()
         # Be explicit about what we want to keep; trafilatura already removes nav/ads
         md = trafilatura.extract(
             html,
@@ -68,24 +155,25 @@ def extract_markdown(html: str, url: str) -> Tuple[str, str]:
     # Fallback to readability + markdownify if needed
     if not md:
         try:
-            from bs4 import BeautifulSoup
-            from readability import Document
-            from markdownify import markdownify as md_convert
+            stack = _get_readability_stack()
+            if stack is None:
+                raise ImportError("readability")
+            BeautifulSoup, Document, md_convert = stack
 
             doc = Document(html)
             title = doc.short_title() or title
             content_html = doc.summary(html_partial=True)
 
-            soup = BeautifulSoup(content_html, "lxml")
+            content_soup = BeautifulSoup(content_html, "lxml")
             # Remove likely non-content elements
-            for tag in soup(["script", "style", "noscript", "header", "footer", "form", "nav", "aside"]):
+            for tag in content_soup(["script", "style", "noscript", "header", "footer", "form", "nav", "aside"]):
                 tag.decompose()
             # Remove common on-page navigation blocks
-            for bad in soup.select('[role="navigation"], .toc, .table-of-contents, .on-this-page'):
+            for bad in content_soup.select('[role="navigation"], .toc, .table-of-contents, .on-this-page'):
                 bad.decompose()
 
             md = md_convert(
-                str(soup),
+                str(content_soup),
                 heading_style="ATX",
                 strip="script,style",
                 code_friendly=True,
@@ -97,10 +185,8 @@ def extract_markdown(html: str, url: str) -> Tuple[str, str]:
     if md is None:
         # As a last resort, return minimal content with title if possible
         try:
-            from bs4 import BeautifulSoup
-
-            soup = BeautifulSoup(html, "lxml")
-            title = title or (soup.title.string.strip() if soup.title and soup.title.string else "")
+            page = tree if tree is not None else parse_html(html)
+            title = title or (page.findtext(".//title") or "").strip()
         except Exception:
             pass
         return ("", title)
@@ -9,26 +9,65 @@ side-effect free.
 
 from __future__ import annotations
 
-from hashlib import sha256
-from typing import Iterable, Optional
-from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit
 
 import fnmatch
+import re
+
+
+# Non-utm tracking keys; every utm_* key is dropped by the prefix check first
+_TRACKING_PARAMS = frozenset(
+    {
+        "gclid",
+        "fbclid",
+        "msclkid",
+        "mc_cid",
+        "mc_eid",
+        "igshid",
+    }
+)
+
+# Pre-signed S3 query keys: required to fetch the object, so normalize_url keeps
+# them, but they change with every signing; dedup_key ignores them
+_SIGNATURE_PARAMS = frozenset(
+    {
+        "X-Amz-Algorithm",
+        "X-Amz-Credential",
+        "X-Amz-Date",
+        "X-Amz-Expires",
+        "X-Amz-Security-Token",
+        "X-Amz-Signature",
+        "X-Amz-SignedHeaders",
+    }
+)
+
+
+_CANONICAL_HINT_STR = re.compile(r"canonical|og:url", re.IGNORECASE)
+_CANONICAL_HINT_BYTES = re.compile(rb"canonical|og:url", re.IGNORECASE)
+
+# Runs of anything but word chars (Unicode letters/digits, "_"), "." and "-"
+_SLUG_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+@lru_cache(maxsize=1)
+def _canonical_xpaths() -> tuple[Any, ...]:
+    """Compile the canonical-link lookups once: rel=canonical, then og:url.
+
+    lxml is imported on first use so this module loads without it, matching
+    the optional lxml handling in 01_collect.
+    """
+    from lxml.etree import XPath
 
-
-_TRACKING_PARAMS = {
-    "utm_source",
-    "utm_medium",
-    "utm_campaign",
-    "utm_term",
-    "utm_content",
-    "utm_id",
-    "gclid",
-    "fbclid",
-    "msclkid",
-    "mc_cid",
-    "mc_eid",
-}
+    return (
+        XPath(
+            '//link[contains(translate(@rel, "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "canonical")]/@href'
+        ),
+        XPath('//meta[@property="og:url"]/@content'),
+        XPath('//meta[@name="og:url"]/@content'),
+    )
 
 
 def _strip_default_port(scheme: str, netloc: str) -> str:
@@ -40,6 +79,7 @@ def _strip_default_port(scheme: str, netloc: str) -> str:
     return netloc
 
 
+@lru_cache(maxsize=65536)
 def normalize_url(url: str) -> str:
     """Normalize a URL for comparison and deduplication.
 
@@ -61,39 +101,78 @@ def normalize_url(url: str) -> str:
     if path != "/" and path.endswith("/"):
         path = path[:-1]
 
-    # Remove tracking parameters
-    query_items = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _TRACKING_PARAMS and not k.startswith("utm_")]
-    # Sort for stable canonical representation
-    query_items.sort()
-    query = urlencode(query_items)
+    # Most documentation URLs carry no query; skip parse/filter/encode entirely
+    query = parts.query
+    if query:
+        # Remove tracking parameters
+        query_items = [
+            (k, v)
+            for k, v in parse_qsl(query, keep_blank_values=True)
+            if not k.startswith("utm_") and k not in _TRACKING_PARAMS
+        ]
+        # Sort for stable canonical representation (a single pair is already sorted)
+        if "&" in query:
+            query_items.sort()
+        query = urlencode(query_items)
+
+    return parts._replace(scheme=scheme, netloc=netloc, path=path, query=query, fragment="").geturl()
+
+
+@lru_cache(maxsize=65536)
+def dedup_key(url: str) -> str:
+    """Identity of a URL for deduplication and resume.
+
+    Same as :func:`normalize_url`, minus pre-signed S3 signature parameters, so
+    re-signed links to one object compare equal. Fetch the normalized URL, not
+    this key.
+    """
+
+    normalized = normalize_url(url)
+    parts = urlsplit(normalized)
+    if "X-Amz-" not in parts.query:
+        return normalized
+    query = urlencode(
+        [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _SIGNATURE_PARAMS]
+    )
+    return parts._replace(query=query).geturl()
+
+
+def has_canonical_hint(html: str | bytes) -> bool:
+    """Cheap pre-check: whether the page mentions a canonical link or og:url at all."""
 
-    normalized = urlunsplit((scheme, netloc, path, query, ""))
-    return normalized
+    hint = _CANONICAL_HINT_BYTES if isinstance(html, bytes) else _CANONICAL_HINT_STR
+    return hint.search(html) is not None
 
 
-def canonicalize(url: str, html: str) -> Optional[str]:
-    """Extract canonical URL from HTML if present.
+def canonicalize(url: str, html: str | bytes, tree: Any = None) -> Optional[str]:
+    """Extract canonical URL from HTML (text or raw bytes) if present.
+
+    ``tree`` may be an ``lxml.html`` document already parsed from ``html`` so
+    the caller can share one parse with :func:`extract_markdown`.
 
     Returns a normalized absolute URL or None if not found.
     """
 
-    try:
-        from bs4 import BeautifulSoup  # Imported lazily to avoid heavy import cost
-    except Exception:
+    # Most pages carry neither hint; a C-level scan avoids a full HTML parse for them
+    if not has_canonical_hint(html):
         return None
 
     try:
-        soup = BeautifulSoup(html, "lxml")
+        if tree is None:
+            import lxml.html
+
+            tree = lxml.html.fromstring(html)
+        xpaths = _canonical_xpaths()
     except Exception:
         return None
 
-    # Prefer <link rel="canonical" href="...">
-    link = soup.find("link", rel=lambda v: v and "canonical" in str(v).lower())
-    href = link.get("href") if link else None
-    if not href:
-        # Fallback to og:url
-        og = soup.find("meta", property="og:url") or soup.find("meta", attrs={"name": "og:url"})
-        href = og.get("content") if og and og.has_attr("content") else None
+    # XPath runs inside libxml2; prefer <link rel="canonical">, then og:url
+    hrefs: list = []
+    for xpath in xpaths:
+        hrefs = xpath(tree)
+        if hrefs:
+            break
+    href = hrefs[0].strip() if hrefs else None
     if not href:
         return None
 
@@ -108,48 +187,64 @@ def is_allowed(url: str, allow_globs: Iterable[str], deny_globs: Optional[Iterab
     - URL must NOT match any deny glob
     """
 
-    nurl = normalize_url(url)
-    allowed = False
-    for pat in allow_globs:
-        if fnmatch.fnmatchcase(nurl, pat):
-            allowed = True
-            break
-    if not allowed:
-        return False
+    allow_key = tuple(allow_globs)
+    deny_key = tuple(deny_globs) if deny_globs else ()
+    return _cached_url_filter(allow_key, deny_key)(normalize_url(url))
+
+
+@lru_cache(maxsize=64)
+def _cached_url_filter(allow_globs: tuple[str, ...], deny_globs: tuple[str, ...]) -> Callable[[str], bool]:
+    return compile_url_filter(allow_globs, deny_globs)
+
+
+def compile_url_filter(
+    allow_globs: Iterable[str], deny_globs: Optional[Iterable[str]] = None
+) -> Callable[[str], bool]:
+    """Compile allow/deny globs into one predicate over already-normalized URLs.
+
+    Same semantics as :func:`is_allowed`, but each glob list becomes a single
+    alternation regex so a URL is matched in one pass instead of one
+    ``fnmatchcase`` call per pattern.
+    """
+
+    allow_re = _compile_globs(allow_globs)
+    deny_re = _compile_globs(deny_globs or ())
+
+    def _allowed(nurl: str) -> bool:
+        if allow_re is None or allow_re.match(nurl) is None:
+            return False
+        return deny_re is None or deny_re.match(nurl) is None
 
-    if deny_globs:
-        for pat in deny_globs:
-            if fnmatch.fnmatchcase(nurl, pat):
-                return False
-    return True
+    return _allowed
+
+
+def _compile_globs(globs: Iterable[str]) -> Optional[re.Pattern[str]]:
+    patterns = [fnmatch.translate(g) for g in globs]
+    if not patterns:
+        return None
+    return re.compile("|".join(patterns))
 
 
+@lru_cache(maxsize=65536)
 def safe_name(url: str) -> str:
     """Generate a path-safe short filename for a URL.
 
-    Format: "<sha256[:12]>-<short-slug>"
-    The slug is derived from the last path segment, lowercased and sanitized.
+    Format: "<blake2b-48bit-hex>-<short-slug>"
+    The slug is derived from the last path segment, lowercased, with each run
+    of unsafe characters collapsed to a single "-".
     """
 
-    digest = sha256(url.encode("utf-8")).hexdigest()[:12]
+    # Filename disambiguation only: a 48-bit BLAKE2b digest is enough and cheaper than SHA-256
+    digest = blake2b(url.encode("utf-8"), digest_size=6).hexdigest()
     parts = urlsplit(url)
     last_segment = parts.path.rsplit("/", 1)[-1] or parts.netloc
-    slug_chars = []
-    for ch in last_segment.lower():
-        if ch.isalnum():
-            slug_chars.append(ch)
-        elif ch in {"-", "_", "."}:
-            slug_chars.append(ch)
-        else:
-            slug_chars.append("-")
-    slug = "".join(slug_chars).strip("-_.")
+    slug = _SLUG_UNSAFE.sub("-", last_segment.lower()).strip("-_.")
     if not slug:
         slug = parts.netloc.replace(".", "-")
-    if len(slug) > 30:
-        slug = slug[:30]
-    return f"{digest}-{slug}"
+    return f"{digest}-{slug[:30]}"
 
 
+@lru_cache(maxsize=65536)
 def domain_key(url: str) -> str:
     """Return a key for per-domain rate limiting and robots lookup.
 
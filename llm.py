@@ -1,23 +1,36 @@
 from typing import List, Dict, Any, Callable, Tuple
 import os
 import time
-from datetime import datetime
 from config import LLM_CONFIG
 
-# Import llama_cpp lazily to allow running with an Ollama backend without the shared lib
-_llama_import_error: Exception | None = None
-try:
-    from llama_cpp import Llama  # type: ignore
-except Exception as e:  # pragma: no cover - optional dependency at runtime
-    Llama = None  # type: ignore
-    _llama_import_error = e
-
-_ollama_import_error: Exception | None = None
-try:
-    import ollama  # type: ignore
-except Exception as e:  # pragma: no cover - optional dependency at runtime
-    ollama = None  # type: ignore
-    _ollama_import_error = e
+
+# llama_cpp (native lib) and ollama are imported on first use, not at module import,
+# so importing this module stays cheap when neither backend is instantiated
+def _try_import_llama() -> Tuple[Any, Exception | None]:
+    try:
+        from llama_cpp import Llama  # type: ignore
+    except Exception as e:  # pragma: no cover - optional dependency at runtime
+        return None, e
+    return Llama, None
+
+
+def _try_import_ollama() -> Tuple[Any, Exception | None]:
+    try:
+        import ollama  # type: ignore
+    except Exception as e:  # pragma: no cover - optional dependency at runtime
+        return None, e
+    return ollama, None
+
+
+def _iso_now() -> str:
+    """UTC now as ISO-8601 with microseconds and a Z suffix."""
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec)) + f".{ns // 1000:06d}Z"
+
+
+# should_cancel() may hit shared state per call; poll it at most every 50 ms while streaming
+_CANCEL_CHECK_INTERVAL = 0.05
+
 
 class CancelledError(Exception):
     """Raised to indicate user-cancelled streaming with optional partial text."""
@@ -27,6 +40,45 @@ class CancelledError(Exception):
         self.meta = meta or {}
 
 
+class _DeltaBatcher:
+    """Coalesce streamed deltas so on_delta fires per ~max_chars or ~max_ms, not per token."""
+
+    def __init__(self, on_delta: Callable[[str], None] | None, max_chars: int = 64, max_ms: float = 20.0):
+        self._on_delta = on_delta
+        self._max_chars = max_chars
+        self._max_sec = max_ms / 1000.0
+        self._parts: List[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def feed(self, delta: str) -> None:
+        if self._on_delta is None:
+            return
+        self._parts.append(delta)
+        self._size += len(delta)
+        if self._size >= self._max_chars or time.monotonic() - self._last_flush >= self._max_sec:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            pending = "".join(self._parts)
+            self._parts.clear()
+            self._size = 0
+            self._on_delta(pending)
+        self._last_flush = time.monotonic()
+
+
+def _normalize_message(msg: Dict[str, Any]) -> Dict[str, str]:
+    role = msg.get("role", "")
+    content = msg.get("content", "")
+    # History entries are almost always str already; only coerce the odd one out
+    if type(role) is not str:
+        role = str(role)
+    if type(content) is not str:
+        content = str(content)
+    return {"role": role.strip() or "user", "content": content}
+
+
 class LLM:
     """Chat backend wrapper with automatic fallback to Ollama.
 
@@ -35,6 +87,8 @@ class LLM:
     """
 
     def __init__(self):
+        # (source history entries, normalized messages) from the previous call
+        self._history_cache: Tuple[List[Dict[str, Any]], List[Dict[str, str]]] | None = None
         self.temperature: float = LLM_CONFIG["temperature"]
         self.max_tokens: int = LLM_CONFIG["max_tokens"]
         self.n_ctx: int = LLM_CONFIG["n_ctx"]
@@ -50,9 +104,10 @@ class LLM:
         # Try llama.cpp first (auto or llama set)
         if requested_backend in ("auto", "llama", "llama_cpp", "llamacpp"):
             try:
+                Llama, llama_import_error = _try_import_llama()
                 if Llama is None:
                     raise RuntimeError(
-                        f"llama_cpp import failed: {_llama_import_error!r}"
+                        f"llama_cpp import failed: {llama_import_error!r}"
                     )
                 self.llm = Llama(
                     model_path=LLM_CONFIG["model_path"],
@@ -78,9 +133,10 @@ class LLM:
         self._init_ollama()
 
     def _init_ollama(self) -> None:
+        ollama, ollama_import_error = _try_import_ollama()
         if ollama is None:
             raise RuntimeError(
-                f"Ollama backend requested but python 'ollama' package is missing: {_ollama_import_error!r}"
+                f"Ollama backend requested but python 'ollama' package is missing: {ollama_import_error!r}"
             )
         self.ollama_model: str = (
             str(LLM_CONFIG.get("ollama_model") or os.getenv("OLLAMA_MODEL") or "")
@@ -91,13 +147,59 @@ class LLM:
             )
         # Allow custom host via OLLAMA_HOST (default http://127.0.0.1:11434)
         host = LLM_CONFIG.get("ollama_host") or os.getenv("OLLAMA_HOST")
-        if host:
-            ollama.set_base_url(str(host))
+        # One client for the session so its httpx pool keeps the connection alive
+        self._ollama_client = ollama.Client(host=str(host) if host else None)
         self.backend = "ollama"
 
+    def _history_messages(self, history: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Normalize history, reusing entries already normalized on the previous call.
+
+        Chat history is append-only, so the leading entries that are the same
+        dict objects as last time keep their cached normalized form.
+        """
+        cached_src, cached_msgs = self._history_cache or ([], [])
+        limit = min(len(cached_src), len(history))
+        reuse = 0
+        while reuse < limit and history[reuse] is cached_src[reuse]:
+            reuse += 1
+        msgs = cached_msgs[:reuse]
+        msgs.extend(_normalize_message(msg) for msg in history[reuse:])
+        self._history_cache = (list(history), msgs)
+        return msgs
+
     def chat(self, system: str, user: str, history: List[Dict[str, Any]] | None = None) -> str:
-        text, _meta = self.chat_with_meta(system, user, history=history, stream=False)
-        return text
+        return self._chat_nometa(system, user, history)
+
+    def _build_messages(
+        self, system: str, user: str, history: List[Dict[str, Any]] | None
+    ) -> List[Dict[str, str]]:
+        messages: List[Dict[str, str]] = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        if history:
+            messages.extend(self._history_messages(history))
+        messages.append({"role": "user", "content": user})
+        return messages
+
+    def _ollama_options(self) -> Dict[str, Any]:
+        return {
+            "temperature": self.temperature,
+            "num_predict": self.max_tokens,
+            "num_ctx": self.n_ctx,
+        }
+
+    def _chat_nometa(self, system: str, user: str, history: List[Dict[str, Any]] | None = None) -> str:
+        """Non-streaming chat that skips the meta/timing/usage bookkeeping of chat_with_meta()."""
+        messages = self._build_messages(system, user, history)
+        if self.backend == "ollama":
+            resp = self._ollama_client.chat(model=self.ollama_model, messages=messages, options=self._ollama_options())
+            return str(resp.get("message", {}).get("content", "")).strip()
+        out = self.llm.create_chat_completion(
+            messages=messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+        )
+        return out["choices"][0]["message"]["content"].strip()
 
     def chat_with_meta(
         self,
@@ -110,22 +212,15 @@ class LLM:
     ) -> Tuple[str, Dict[str, Any]]:
         """Chat and return (text, meta) with basic observability.
 
-        - Keeps chat() behavior intact by calling this with stream=False.
-        - When stream=True and on_delta is provided, calls on_delta(delta_text) as tokens arrive.
+        - chat() returns the same text through _chat_nometa(), without building meta.
+        - When stream=True and on_delta is provided, calls on_delta(delta_text) as tokens arrive,
+          coalesced into batches of ~64 chars / ~20 ms.
         - Meta includes backend, model, n_ctx, temperature, max_tokens, timing, and usage if available.
         """
-        messages: List[Dict[str, str]] = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        if history:
-            for msg in history:
-                role = str(msg.get("role", "")).strip() or "user"
-                content = str(msg.get("content", ""))
-                messages.append({"role": role, "content": content})
-        messages.append({"role": "user", "content": user})
+        messages = self._build_messages(system, user, history)
 
         start_monotonic = time.perf_counter()
-        start_iso = datetime.utcnow().isoformat() + "Z"
+        start_iso = _iso_now()
         text: str = ""
         meta: Dict[str, Any] = {
             "backend": self.backend,
@@ -141,28 +236,37 @@ class LLM:
         }
 
         if self.backend == "ollama":
-            options = {
-                "temperature": self.temperature,
-                "num_predict": self.max_tokens,
-                "num_ctx": self.n_ctx,
-            }
+            options = self._ollama_options()
             try:
                 if stream:
                     last_chunk: Dict[str, Any] | None = None
-                    for chunk in ollama.chat(model=self.ollama_model, messages=messages, options=options, stream=True):
-                        if should_cancel and should_cancel():
-                            meta_cancel = dict(meta)
-                            end_monotonic = time.perf_counter()
-                            meta_cancel["end_time"] = datetime.utcnow().isoformat() + "Z"
-                            meta_cancel["elapsed_sec"] = max(0.0, end_monotonic - start_monotonic)
-                            meta_cancel["cancelled"] = True
-                            raise CancelledError(partial_text=text, meta=meta_cancel)
+                    # Accumulate as a list: += on a str may copy the whole reply per token
+                    text_parts: List[str] = []
+                    batcher = _DeltaBatcher(on_delta)
+                    next_cancel_check = 0.0
+                    for chunk in self._ollama_client.chat(model=self.ollama_model, messages=messages, options=options, stream=True):
+                        if should_cancel:
+                            now = time.monotonic()
+                            if now >= next_cancel_check:
+                                next_cancel_check = now + _CANCEL_CHECK_INTERVAL
+                                if should_cancel():
+                                    # meta is not used after raising, so mark it in place
+                                    meta["end_time"] = _iso_now()
+                                    meta["elapsed_sec"] = max(0.0, time.perf_counter() - start_monotonic)
+                                    meta["cancelled"] = True
+                                    batcher.flush()
+                                    raise CancelledError(partial_text="".join(text_parts), meta=meta)
                         last_chunk = chunk
-                        delta = str(chunk.get("message", {}).get("content", ""))
+                        # Ollama chunks always carry message.content as a str
+                        try:
+                            delta = chunk["message"]["content"]
+                        except (KeyError, TypeError):
+                            delta = ""
                         if delta:
-                            text += delta
-                            if on_delta:
-                                on_delta(delta)
+                            text_parts.append(delta)
+                            batcher.feed(delta)
+                    batcher.flush()
+                    text = "".join(text_parts)
                     # Extract usage/timings from the last chunk if present
                     if last_chunk:
                         prompt_eval_count = last_chunk.get("prompt_eval_count")
@@ -191,7 +295,7 @@ class LLM:
                             except Exception:
                                 pass
                 else:
-                    resp = ollama.chat(model=self.ollama_model, messages=messages, options=options)
+                    resp = self._ollama_client.chat(model=self.ollama_model, messages=messages, options=options)
                     text = str(resp.get("message", {}).get("content", "")).strip()
                     usage: Dict[str, Any] = {}
                     if resp.get("prompt_eval_count") is not None:
@@ -216,6 +320,8 @@ class LLM:
                             meta["total_duration_sec"] = float(total_duration) / 1e9
                         except Exception:
                             pass
+            except CancelledError:
+                raise
             except Exception as e:
                 meta["warnings"].append(f"ollama.chat error: {e}")
                 raise
@@ -223,29 +329,39 @@ class LLM:
             # llama.cpp backend
             try:
                 if stream:
+                    # Accumulate as a list: += on a str may copy the whole reply per token
+                    text_parts: List[str] = []
+                    batcher = _DeltaBatcher(on_delta)
+                    next_cancel_check = 0.0
                     for part in self.llm.create_chat_completion(
                         messages=messages,
                         temperature=self.temperature,
                         max_tokens=self.max_tokens,
                         stream=True,
                     ):
-                        if should_cancel and should_cancel():
-                            meta_cancel = dict(meta)
-                            end_monotonic = time.perf_counter()
-                            meta_cancel["end_time"] = datetime.utcnow().isoformat() + "Z"
-                            meta_cancel["elapsed_sec"] = max(0.0, end_monotonic - start_monotonic)
-                            meta_cancel["cancelled"] = True
-                            raise CancelledError(partial_text=text, meta=meta_cancel)
+                        if should_cancel:
+                            now = time.monotonic()
+                            if now >= next_cancel_check:
+                                next_cancel_check = now + _CANCEL_CHECK_INTERVAL
+                                if should_cancel():
+                                    # meta is not used after raising, so mark it in place
+                                    meta["end_time"] = _iso_now()
+                                    meta["elapsed_sec"] = max(0.0, time.perf_counter() - start_monotonic)
+                                    meta["cancelled"] = True
+                                    batcher.flush()
+                                    raise CancelledError(partial_text="".join(text_parts), meta=meta)
                         # Depending on version, delta path may vary
-                        delta = ""
                         try:
-                            delta = str(part["choices"][0].get("delta", {}).get("content", ""))
-                        except Exception:
-                            delta = str(part.get("choices", [{}])[0].get("text", ""))
+                            choice = part["choices"][0]
+                        except (KeyError, IndexError, TypeError):
+                            continue
+                        step = choice.get("delta")
+                        delta = step.get("content") if step else choice.get("text")
                         if delta:
-                            text += delta
-                            if on_delta:
-                                on_delta(delta)
+                            text_parts.append(delta)
+                            batcher.feed(delta)
+                    batcher.flush()
+                    text = "".join(text_parts)
                 else:
                     out = self.llm.create_chat_completion(
                         messages=messages,
@@ -256,11 +372,13 @@ class LLM:
                     if isinstance(out, dict) and out.get("usage"):
                         # llama.cpp may include usage in some builds
                         meta["usage"] = dict(out.get("usage", {}))
+            except CancelledError:
+                raise
             except Exception as e:
                 meta["warnings"].append(f"llama.cpp error: {e}")
                 raise
 
         end_monotonic = time.perf_counter()
-        meta["end_time"] = datetime.utcnow().isoformat() + "Z"
+        meta["end_time"] = _iso_now()
         meta["elapsed_sec"] = max(0.0, end_monotonic - start_monotonic)
         return text, meta
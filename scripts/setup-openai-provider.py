@@ -8,6 +8,7 @@ import requests
 import json
 import os
 from typing import Optional
+from requests.adapters import HTTPAdapter
 
 # Configuration
 API_BASE = os.getenv("API_BASE", "http://localhost:8000")
@@ -35,6 +36,12 @@ def get_auth_headers():
         headers["Authorization"] = f"Bearer {ADMIN_TOKEN}"
     return headers
 
+# One keep-alive session for every call; auth headers are set on it once
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+SESSION.headers.update(get_auth_headers())
+
 def get_session_cookies():
     """Get session cookies for authentication"""
     # For now, we'll try without cookies since auth is disabled by default
@@ -44,7 +51,7 @@ def setup_openai_provider(api_key: str, base_url: Optional[str] = None, organiza
     """Set up OpenAI provider with specific models"""
     
     # Check if provider already exists
-    response = requests.get(PROVIDERS_ENDPOINT, headers=get_auth_headers(), cookies=get_session_cookies())
+    response = SESSION.get(PROVIDERS_ENDPOINT, cookies=get_session_cookies())
     if response.status_code == 200:
         providers = response.json()
         existing_provider = next((p for p in providers if p["provider"] == "openai"), None)
@@ -63,9 +70,8 @@ def setup_openai_provider(api_key: str, base_url: Optional[str] = None, organiza
             if organization:
                 update_data["organization"] = organization
                 
-            response = requests.patch(
+            response = SESSION.patch(
                 f"{PROVIDERS_ENDPOINT}/{existing_provider['id']}", 
-                headers=get_auth_headers(),
                 cookies=get_session_cookies(),
                 json=update_data
             )
@@ -90,9 +96,8 @@ def setup_openai_provider(api_key: str, base_url: Optional[str] = None, organiza
     if organization:
         provider_data["organization"] = organization
     
-    response = requests.post(
+    response = SESSION.post(
         PROVIDERS_ENDPOINT,
-        headers=get_auth_headers(),
         cookies=get_session_cookies(),
         json=provider_data
     )
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+# Reuse one connection to the API for all three checks
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
 
 def test_provider_models_direct():
     """Test the provider models loading directly"""
     
     # First, let's check what providers exist
     print("1. Checking providers...")
-    response = requests.get("http://localhost:8000/api/admin/llm/providers")
+    response = SESSION.get("http://localhost:8000/api/admin/llm/providers")
     if response.status_code == 200:
         providers = response.json()
         print(f"Found {len(providers)} providers:")
@@ -21,7 +26,7 @@ def test_provider_models_direct():
         return
     
     print("\n2. Testing models endpoint...")
-    response = requests.get("http://localhost:8000/api/models")
+    response = SESSION.get("http://localhost:8000/api/models")
     if response.status_code == 200:
         data = response.json()
         print(f"Providers: {data.get('providers')}")
@@ -35,7 +40,7 @@ def test_provider_models_direct():
         print(f"Failed to get models: {response.status_code}")
     
     print("\n3. Testing admin models endpoint...")
-    response = requests.get("http://localhost:8000/api/admin/models")
+    response = SESSION.get("http://localhost:8000/api/admin/models")
     if response.status_code == 200:
         data = response.json()
         print(f"Providers: {data.get('providers')}")
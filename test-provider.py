@@ -1,17 +1,36 @@
 #!/usr/bin/env python3
 import requests
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+# One keep-alive session; its pool holds a connection per concurrent probe
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+SESSION.headers["Connection"] = "keep-alive"
+
+BASE_URL = "http://localhost:8000"
+ENDPOINTS = ("/api/models", "/api/admin/models", "/api/admin/llm/providers")
+
+def fetch(endpoint):
+    return SESSION.get(BASE_URL + endpoint)
 
 def test_provider_models():
     """Test the provider models loading"""
-    
+
+    # The probes are independent: fire them together, report in order
+    with ThreadPoolExecutor(max_workers=len(ENDPOINTS)) as ex:
+        models_resp, admin_models_resp, providers_resp = ex.map(fetch, ENDPOINTS)
+
     # Test the models endpoint
     print("Testing /api/models endpoint...")
-    response = requests.get("http://localhost:8000/api/models")
+    response = models_resp
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"Providers: {data.get('providers')}")
         print(f"Models count: {len(data.get('models', []))}")
         
@@ -24,11 +43,11 @@ def test_provider_models():
     
     # Test the admin models endpoint
     print("Testing /api/admin/models endpoint...")
-    response = requests.get("http://localhost:8000/api/admin/models")
+    response = admin_models_resp
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
-        data = response.json()
+        data = orjson.loads(response.content)
         print(f"Providers: {data.get('providers')}")
         print(f"Models count: {len(data.get('models', []))}")
         
@@ -41,11 +60,11 @@ def test_provider_models():
     
     # Test the providers endpoint
     print("Testing /api/admin/llm/providers endpoint...")
-    response = requests.get("http://localhost:8000/api/admin/llm/providers")
+    response = providers_resp
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
-        providers = response.json()
+        providers = orjson.loads(response.content)
         print(f"Providers count: {len(providers)}")
         for provider in providers:
             print(f"  - {provider['provider']}: {provider.get('name', 'N/A')}")
@@ -1,28 +1,53 @@
+from functools import lru_cache
 from typing import Optional
 import sqlglot as sg
-import sqlfluff
+from sqlfluff.api.simple import get_simple_config
+from sqlfluff.core import FluffConfig, Linter
 
+@lru_cache(maxsize=512)
 def transpile_sql(sql: str, source: str, target: str) -> str:
     """Transpile SQL between dialects (e.g., snowflake → bigquery)."""
     result = sg.transpile(sql, read=source, write=target)
     return result[0] if result else ""
 
+@lru_cache(maxsize=32)
+def _fluff_config(dialect: str) -> FluffConfig:
+    # Same config sqlfluff.lint/fix build per call; loading it is a large share of their cost
+    return get_simple_config(dialect=dialect)
+
+def _lint_and_fix(sql: str, dialect: str) -> tuple[list, str]:
+    """Lint and fix in one sqlfluff parse; returns (violation records, fixed SQL).
+
+    Clean SQL is returned as-is without rendering a fix.
+    """
+    cfg = _fluff_config(dialect)
+    result = Linter(config=cfg).lint_string_wrapped(sql, fix=True)
+    records = result.as_records()
+    violations = records[0]["violations"] if records else []
+    if not violations:
+        return violations, sql
+    # Like sqlfluff.fix: leave unparsable SQL untouched unless configured otherwise
+    _, num_errors = result.count_tmp_prs_errors()
+    if num_errors and not cfg.get("fix_even_unparsable"):
+        return violations, sql
+    return violations, result.paths[0].files[0].fix_string()[0]
+
+@lru_cache(maxsize=512)
 def lint_sql(sql: str, dialect: str) -> str:
     """Return lint report; if autofix helps, include fixed SQL."""
-    violations = sqlfluff.lint(sql, dialect=dialect)
-    fixed = sqlfluff.fix(sql, dialect=dialect)
+    violations, fixed = _lint_and_fix(sql, dialect)
 
     if not violations:
-        return "No lint issues found.\n\n" + fixed
+        return "No lint issues found.\n\n" + sql
 
     lines = ["Lint issues:"]
-    # sqlfluff 3.x returns list[dict] with keys: line_no, line_pos, rule_code, description
-    # Some versions return objects; handle both gracefully.
+    # sqlfluff 3.x returns list[dict] with keys: start_line_no, start_line_pos, code, description
+    # Older versions used line_no/line_pos/rule_code or objects; handle all gracefully.
     for v in violations:
         try:
-            line_no = v.get("line_no") if isinstance(v, dict) else getattr(v, "line_no", None)
-            line_pos = v.get("line_pos") if isinstance(v, dict) else getattr(v, "line_pos", None)
-            rule_code = v.get("rule_code") if isinstance(v, dict) else getattr(v, "rule_code", "?")
+            line_no = v.get("start_line_no", v.get("line_no")) if isinstance(v, dict) else getattr(v, "line_no", None)
+            line_pos = v.get("start_line_pos", v.get("line_pos")) if isinstance(v, dict) else getattr(v, "line_pos", None)
+            rule_code = v.get("code", v.get("rule_code", "?")) if isinstance(v, dict) else getattr(v, "rule_code", "?")
             description = v.get("description") if isinstance(v, dict) else getattr(v, "description", "")
         except Exception:
             line_no = getattr(v, "line_no", None)
@@ -1,10 +1,29 @@
 #!/usr/bin/env python3
 import requests
-import json
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+# Keep-alive session shared by every call to the API
+SESSION = requests.Session()
+# Retry transient gateway errors quickly; once retries run out the last
+# response is returned so update_provider still reports the status
+_retry = Retry(
+    total=3,
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=("PATCH", "GET"),
+    raise_on_status=False,
+)
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=_retry)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+SESSION.headers["Connection"] = "keep-alive"
 
 # Configuration
 API_BASE = "http://localhost:8000"
 PROVIDER_ID = 3  # The OpenAI provider ID we saw earlier
+TIMEOUT = (2, 5)  # (connect, read) seconds
 
 def update_provider(api_key):
     """Update the OpenAI provider with an API key"""
@@ -13,10 +32,11 @@ def update_provider(api_key):
         "api_key": api_key
     }
     
-    response = requests.patch(
+    response = SESSION.patch(
         f"{API_BASE}/api/admin/llm/providers/{PROVIDER_ID}",
         headers={"Content-Type": "application/json"},
-        json=update_data
+        data=orjson.dumps(update_data),
+        timeout=TIMEOUT
     )
     
     if response.status_code == 200:
@@ -1,35 +1,108 @@
 import difflib
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Sequence, Union
 
-def side_by_side(a: str, b: str) -> Tuple[List[str], List[str], List[Optional[str]], List[Optional[str]]]:
-    """Return side-by-side diff data between strings ``a`` and ``b``.
+# diff-match-patch is optional; without it we fall back to difflib.SequenceMatcher
+try:
+    from diff_match_patch import diff_match_patch
+except Exception:  # pragma: no cover - optional dependency
+    diff_match_patch = None
+
+# (tag, left_lines, right_lines) with tag in 'equal' / 'delete' / 'insert' / 'replace'
+Block = Tuple[str, List[str], List[str]]
+# Either a whole text or its lines already split (without line endings)
+Text = Union[str, Sequence[str]]
+
+
+def _as_lines(text: Text) -> List[str]:
+    return text.splitlines() if isinstance(text, str) else list(text)
+
+
+def _as_text(text: Text) -> str:
+    return text if isinstance(text, str) else ''.join(line + '\n' for line in text)
+
+
+def _dmp_blocks(a: str, b: str) -> List[Block]:
+    """Line-level Myers diff via diff-match-patch.
+
+    Lines are mapped to single characters first (``diff_linesToChars``) so the
+    diff runs over lines rather than characters, then mapped back.
+    """
+    # Terminate the last line so "w" and "w\n" compare as the same line
+    if a and not a.endswith('\n'):
+        a += '\n'
+    if b and not b.endswith('\n'):
+        b += '\n'
+    dmp = diff_match_patch()
+    # The default 1 s budget silently degrades large diffs to a coarse result;
+    # like SequenceMatcher, always compute the full diff
+    dmp.Diff_Timeout = 0
+    chars_a, chars_b, line_array = dmp.diff_linesToChars(a, b)
+    diffs = dmp.diff_main(chars_a, chars_b, False)
+    # No diff_cleanupSemantic: with one char per line it swallows short unchanged runs
+    dmp.diff_charsToLines(diffs, line_array)
+
+    blocks: List[Block] = []
+    for op, text in diffs:
+        lines = text.splitlines()
+        if op == dmp.DIFF_EQUAL:
+            blocks.append(('equal', lines, lines))
+        elif op == dmp.DIFF_DELETE:
+            blocks.append(('delete', lines, []))
+        elif blocks and blocks[-1][0] == 'delete':
+            # A deletion directly followed by an insertion is a replacement
+            blocks[-1] = ('replace', blocks[-1][1], lines)
+        else:
+            blocks.append(('insert', [], lines))
+    return blocks
+
+
+def _sequence_matcher_blocks(a_lines: List[str], b_lines: List[str]) -> List[Block]:
+    """Line-level diff via ``SequenceMatcher`` opcodes over already-split lines."""
+    # autojunk would treat frequent lines (blank lines, braces) as junk on big inputs
+    sm = difflib.SequenceMatcher(a=a_lines, b=b_lines, autojunk=False)
+    return [(tag, a_lines[i1:i2], b_lines[j1:j2]) for tag, i1, i2, j1, j2 in sm.get_opcodes()]
+
+
+def side_by_side(a: Text, b: Text) -> Tuple[List[str], List[str], List[Optional[str]], List[Optional[str]]]:
+    """Return side-by-side diff data between ``a`` and ``b``.
+
+    Each side is a string or a sequence of its lines; callers diffing one
+    side repeatedly can split it once and pass the lines.
 
     Returns tuple of (left_lines, right_lines, left_styles, right_styles) where
     styles list contains ``'del'`` for deletions and ``'add'`` for additions.
-    ``None`` indicates unchanged line.
+    ``None`` indicates unchanged line. Replaced lines are paired on the same
+    row, with the shorter side padded by empty lines.
     """
     left_lines: List[str] = []
     right_lines: List[str] = []
     left_styles: List[Optional[str]] = []
     right_styles: List[Optional[str]] = []
 
-    for line in difflib.ndiff(a.splitlines(), b.splitlines()):
-        tag = line[:2]
-        text = line[2:]
-        if tag == ' ':  # unchanged
-            left_lines.append('  ' + text)
-            right_lines.append('  ' + text)
-            left_styles.append(None)
-            right_styles.append(None)
-        elif tag == '- ':  # deletion on left
-            left_lines.append('- ' + text)
-            right_lines.append('')
-            left_styles.append('del')
-            right_styles.append(None)
-        elif tag == '+ ':  # addition on right
-            left_lines.append('')
-            right_lines.append('+ ' + text)
-            left_styles.append(None)
-            right_styles.append('add')
-        # ignore '? ' lines produced by ndiff
+    if diff_match_patch is not None:
+        blocks = _dmp_blocks(_as_text(a), _as_text(b))
+    else:
+        blocks = _sequence_matcher_blocks(_as_lines(a), _as_lines(b))
+    for tag, old, new in blocks:
+        if tag == 'equal':  # unchanged
+            for text in old:
+                left_lines.append('  ' + text)
+                right_lines.append('  ' + text)
+                left_styles.append(None)
+                right_styles.append(None)
+            continue
+        # delete / insert / replace: deletions on the left, additions on the right
+        for k in range(max(len(old), len(new))):
+            if k < len(old):
+                left_lines.append('- ' + old[k])
+                left_styles.append('del')
+            else:
+                left_lines.append('')
+                left_styles.append(None)
+            if k < len(new):
+                right_lines.append('+ ' + new[k])
+                right_styles.append('add')
+            else:
+                right_lines.append('')
+                right_styles.append(None)
     return left_lines, right_lines, left_styles, right_styles
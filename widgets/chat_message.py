@@ -1,17 +1,22 @@
 from __future__ import annotations
 
 from PySide6.QtWidgets import (
-    QWidget, QHBoxLayout, QVBoxLayout, QLabel, QTextBrowser,
+    QWidget, QHBoxLayout, QVBoxLayout, QLabel,
     QListWidget, QListWidgetItem, QFrame, QPushButton, QPlainTextEdit
 )
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtGui import QFont, QTextCursor
 
 import markdown
 import re
 
 from config import ACCENT_COLOR, NEUTRALS, BORDER_RADIUS
 
+# Shared across messages: compiled once, and Markdown is reset after each convert
+_CODE_FENCE_RE = re.compile(r"```[\w]*\n(.*?)```", re.DOTALL | re.ASCII)
+_FENCE_OPEN_RE = re.compile(r"```[\w]*\n", re.ASCII)
+_MD = markdown.Markdown(extensions=["fenced_code", "tables"])
+
 
 class CodeBlockWidget(QFrame):
     """Code block with inline toolbar actions."""
@@ -44,9 +49,9 @@ class CodeBlockWidget(QFrame):
                 "QPushButton {border: 1px solid #d1d5db; border-radius: 4px; background: #ffffff; font-size: 11px;}"\
                 "QPushButton:hover {background: #f3f4f6;}"
             )
-        self.btn_copy.clicked.connect(lambda: self.copy_clicked.emit(self.code))
-        self.btn_insert.clicked.connect(lambda: self.insert_clicked.emit(self.code))
-        self.btn_expand.clicked.connect(lambda: self.expand_clicked.emit(self.code))
+        self.btn_copy.clicked.connect(self._emit_copy)
+        self.btn_insert.clicked.connect(self._emit_insert)
+        self.btn_expand.clicked.connect(self._emit_expand)
         toolbar.addStretch(1)
         toolbar.addWidget(self.btn_copy)
         toolbar.addWidget(self.btn_insert)
@@ -59,6 +64,31 @@ class CodeBlockWidget(QFrame):
         self.editor.setFont(QFont("Courier", 10))
         layout.addWidget(self.editor)
 
+    def set_code(self, code: str):
+        if code != self.code:
+            self.code = code
+            self.editor.setPlainText(code)
+
+    def append_code(self, text: str):
+        """Append ``text`` in place; only the edited end of the document is relaid out."""
+        if not text:
+            return
+        self.code += text
+        cursor = QTextCursor(self.editor.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+
+    # Bound-method slots rather than lambdas: no closure per button, and Qt
+    # drops the connection together with the widget
+    def _emit_copy(self):
+        self.copy_clicked.emit(self.code)
+
+    def _emit_insert(self):
+        self.insert_clicked.emit(self.code)
+
+    def _emit_expand(self):
+        self.expand_clicked.emit(self.code)
+
     def enterEvent(self, event):  # pragma: no cover - UI interaction
         for btn in (self.btn_copy, self.btn_insert, self.btn_expand):
             btn.setVisible(True)
@@ -82,7 +112,12 @@ class ChatMessageWidget(QWidget):
         self.role = role
         self.theme = theme
         self.raw_text = text
-        self.renderer = markdown.Markdown(extensions=["fenced_code", "tables"])
+        # Incremental streaming state: text before _render_cursor has final widgets
+        self._render_cursor = 0
+        self._open_code_block: CodeBlockWidget | None = None
+        self._last_text_label: QLabel | None = None
+        # HTML of finished text segments, reused when render_content rebuilds
+        self._md_cache: dict[str, str] = {}
 
         self.main_layout = QHBoxLayout(self)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
@@ -127,51 +162,113 @@ class ChatMessageWidget(QWidget):
             self.render_content()
 
     def render_content(self):
-        # Clear previous widgets
-        while self.content_layout.count():
-            item = self.content_layout.takeAt(0)
-            w = item.widget()
-            if w:
-                w.deleteLater()
-        text = self.raw_text
-        code_pattern = re.compile(r"```[\w]*\n(.*?)```", re.DOTALL)
-        last_end = 0
-        for match in code_pattern.finditer(text):
-            before = text[last_end:match.start()]
-            if before.strip():
-                html = self.renderer.convert(before)
-                lbl = QTextBrowser()
-                lbl.setHtml(self._wrap_html(html))
-                lbl.setOpenExternalLinks(True)
-                lbl.setStyleSheet("background: transparent; border: none;")
-                lbl.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-                lbl.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-                self.content_layout.addWidget(lbl)
-                self.renderer.reset()
-            code = match.group(1)
-            cb = CodeBlockWidget(code)
-            cb.copy_clicked.connect(self.copy_code)
-            cb.insert_clicked.connect(self.insert_code)
-            cb.expand_clicked.connect(self.expand_code)
-            self.content_layout.addWidget(cb)
-            last_end = match.end()
-        after = text[last_end:]
-        if after.strip() or text.strip() == "":
-            html = self.renderer.convert(after)
-            lbl = QTextBrowser()
-            lbl.setHtml(self._wrap_html(html))
-            lbl.setOpenExternalLinks(True)
-            lbl.setStyleSheet("background: transparent; border: none;")
-            lbl.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-            lbl.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-            self.content_layout.addWidget(lbl)
-            self.renderer.reset()
+        """Rebuild all content widgets from ``raw_text``."""
+        # Defer painting until all content widgets are in place
+        self.setUpdatesEnabled(False)
+        try:
+            # Clear previous widgets
+            while self.content_layout.count():
+                item = self.content_layout.takeAt(0)
+                w = item.widget()
+                if w:
+                    w.deleteLater()
+            self._last_text_label = None
+            self._open_code_block = None
+            text = self.raw_text
+            last_end = 0
+            for match in _CODE_FENCE_RE.finditer(text):
+                before = text[last_end:match.start()]
+                if before.strip():
+                    self._add_text_label().setText(self._wrap_html(self._convert_cached(before)))
+                self._add_code_block(match.group(1))
+                last_end = match.end()
+            after = text[last_end:]
+            if after.strip() or text.strip() == "":
+                self._last_text_label = self._add_text_label()
+                self._last_text_label.setText(self._wrap_html(self._convert_cached(after)))
+            # Streaming continues from the trailing text segment
+            self._render_cursor = last_end
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def _render_tail(self):
+        """Render ``raw_text[_render_cursor:]``, touching only the trailing segment.
+
+        Widgets for text before ``_render_cursor`` are final; the open text
+        segment is re-rendered on its own and an open code fence is shown as a
+        code block as soon as it starts.
+        """
+        while True:
+            tail = self.raw_text[self._render_cursor:]
+            if self._open_code_block is not None:
+                end = tail.find("```")
+                # Hold back trailing backticks that may be the start of the
+                # closing fence, so the shown code only ever grows
+                code = tail[:end] if end != -1 else tail.rstrip("`")
+                block = self._open_code_block
+                block.append_code(code[len(block.code):])
+                if end == -1:
+                    return
+                self._open_code_block = None
+                self._render_cursor += end + 3
+                continue
+            match = _FENCE_OPEN_RE.search(tail)
+            segment = tail if match is None else tail[:match.start()]
+            if segment.strip():
+                if self._last_text_label is None:
+                    self._last_text_label = self._add_text_label()
+                # A segment followed by a fence is final; the growing tail is not cached
+                html = self._convert_cached(segment) if match is not None else self._convert(segment)
+                self._last_text_label.setText(self._wrap_html(html))
+            elif self._last_text_label is not None:
+                # What looked like text was only the start of a fence
+                self._last_text_label.deleteLater()
+                self._last_text_label = None
+            if match is None:
+                return
+            self._last_text_label = None
+            self._open_code_block = self._add_code_block("")
+            self._render_cursor += match.end()
+
+    def _convert(self, text: str) -> str:
+        html = _MD.convert(text)
+        _MD.reset()
+        return html
+
+    def _convert_cached(self, text: str) -> str:
+        html = self._md_cache.get(text)
+        if html is None:
+            html = self._convert(text)
+            if len(self._md_cache) >= 8:
+                self._md_cache.pop(next(iter(self._md_cache)))
+            self._md_cache[text] = html
+        return html
+
+    def _add_text_label(self) -> QLabel:
+        # A rich-text QLabel lays out the same HTML as QTextBrowser without a
+        # scroll area, viewport and scrollbars per text segment
+        lbl = QLabel()
+        lbl.setTextFormat(Qt.RichText)
+        lbl.setWordWrap(True)
+        lbl.setOpenExternalLinks(True)
+        lbl.setTextInteractionFlags(Qt.TextBrowserInteraction)
+        lbl.setStyleSheet("background: transparent; border: none;")
+        self.content_layout.addWidget(lbl)
+        return lbl
+
+    def _add_code_block(self, code: str) -> CodeBlockWidget:
+        cb = CodeBlockWidget(code)
+        cb.copy_clicked.connect(self.copy_code)
+        cb.insert_clicked.connect(self.insert_code)
+        cb.expand_clicked.connect(self.expand_code)
+        self.content_layout.addWidget(cb)
+        return cb
 
     def _wrap_html(self, body: str) -> str:
         return (
             "<style>pre{background:#f8fafc;padding:8px;border-radius:6px;overflow-x:auto;}"\
             "code{font-family:'SF Mono','Cascadia Code',monospace;}"\
-            "</style><body>{}</body>".format(body)
+            "</style><body>" + body + "</body>"
         )
 
     def set_text(self, text: str):
@@ -180,7 +277,11 @@ class ChatMessageWidget(QWidget):
 
     def append_stream(self, delta: str):
         self.raw_text += delta
-        self.render_content()
+        self.setUpdatesEnabled(False)
+        try:
+            self._render_tail()
+        finally:
+            self.setUpdatesEnabled(True)
 
     def to_plain_text(self) -> str:
         return self.raw_text.strip()
@@ -195,7 +296,21 @@ class MessageList(QListWidget):
         self.setStyleSheet("QListWidget{background:transparent;border:none;}")
         self.setSpacing(8)
         self.current_assistant: ChatMessageWidget | None = None
+        # Survives the per-request reset of current_assistant so the last
+        # reply can be read without scanning every row
+        self._last_assistant: ChatMessageWidget | None = None
         self.skeleton_item: QListWidgetItem | None = None
+        self._scroll_pending = False
+
+    def _request_scroll(self):
+        # Coalesce scroll requests (one per streamed delta) into one per frame
+        if not self._scroll_pending:
+            self._scroll_pending = True
+            QTimer.singleShot(16, self._do_scroll)
+
+    def _do_scroll(self):
+        self._scroll_pending = False
+        self.scrollToBottom()
 
     def add_user_message(self, text: str):
         widget = ChatMessageWidget("user", text)
@@ -203,7 +318,7 @@ class MessageList(QListWidget):
         item.setSizeHint(widget.sizeHint())
         self.addItem(item)
         self.setItemWidget(item, widget)
-        self.scrollToBottom()
+        self._request_scroll()
 
     def add_assistant_message(self, text: str = "") -> ChatMessageWidget:
         widget = ChatMessageWidget("assistant", text)
@@ -212,7 +327,8 @@ class MessageList(QListWidget):
         self.addItem(item)
         self.setItemWidget(item, widget)
         self.current_assistant = widget
-        self.scrollToBottom()
+        self._last_assistant = widget
+        self._request_scroll()
         return widget
 
     def show_skeleton(self, skeleton: QWidget):
@@ -221,7 +337,7 @@ class MessageList(QListWidget):
         self.addItem(item)
         self.setItemWidget(item, skeleton)
         self.skeleton_item = item
-        self.scrollToBottom()
+        self._request_scroll()
 
     def remove_skeleton(self):
         if self.skeleton_item is not None:
@@ -233,7 +349,8 @@ class MessageList(QListWidget):
         if self.current_assistant is None:
             self.current_assistant = self.add_assistant_message("")
         self.current_assistant.append_stream(text)
-        self.scrollToBottom()
+        self._last_assistant = self.current_assistant
+        self._request_scroll()
         return self.current_assistant
 
     def set_final_text(self, text: str) -> ChatMessageWidget:
@@ -241,17 +358,19 @@ class MessageList(QListWidget):
             self.current_assistant = self.add_assistant_message(text)
         else:
             self.current_assistant.set_text(text)
-        self.scrollToBottom()
+        self._last_assistant = self.current_assistant
+        self._request_scroll()
         return self.current_assistant
 
     def clear_content(self):
-        self.clear()
+        self.setUpdatesEnabled(False)
+        try:
+            self.clear()
+        finally:
+            self.setUpdatesEnabled(True)
         self.current_assistant = None
+        self._last_assistant = None
         self.skeleton_item = None
 
     def last_assistant_text(self) -> str:
-        for i in range(self.count()-1, -1, -1):
-            w = self.itemWidget(self.item(i))
-            if isinstance(w, ChatMessageWidget) and w.role == "assistant":
-                return w.to_plain_text()
-        return ""
+        return self._last_assistant.to_plain_text() if self._last_assistant else ""
@@ -1,18 +1,69 @@
+from weakref import WeakSet
+
 from PySide6.QtWidgets import QFrame
-from PySide6.QtCore import QPropertyAnimation, QRect
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QColor, QLinearGradient, QPainter
 
 
 class SkeletonBubble(QFrame):
-    """Simple shimmering skeleton placeholder."""
+    """Simple shimmering skeleton placeholder.
+
+    A single class-level timer drives the shimmer of every visible bubble and
+    stops once none are shown.
+    """
+
+    _visible: "WeakSet[SkeletonBubble]" = WeakSet()
+    _timer: QTimer | None = None
+    _phase = 0.0
+    _FRAME_MS = 33
+    _PHASE_STEP = 0.03
 
     def __init__(self, width: int = 200, height: int = 40):
         super().__init__()
         self.setFixedSize(width, height)
-        self.setStyleSheet("border-radius:6px; background-color:#e5e7eb;")
-        # Optional subtle animation on the palette to mimic shimmer
-        self.anim = QPropertyAnimation(self, b"geometry")
-        self.anim.setDuration(1000)
-        self.anim.setStartValue(QRect(0, 0, width, height))
-        self.anim.setEndValue(QRect(0, 0, width, height))
-        self.anim.setLoopCount(-1)
-        self.anim.start()
+
+    @classmethod
+    def _tick(cls):
+        cls._phase = (cls._phase + cls._PHASE_STEP) % 1.0
+        for bubble in list(cls._visible):
+            try:
+                bubble.update()
+            except RuntimeError:  # C++ side already deleted
+                cls._visible.discard(bubble)
+        if not cls._visible and cls._timer is not None:
+            cls._timer.stop()
+
+    def showEvent(self, event):  # pragma: no cover - UI interaction
+        cls = type(self)
+        cls._visible.add(self)
+        if cls._timer is None:
+            cls._timer = QTimer()
+            cls._timer.setInterval(cls._FRAME_MS)
+            cls._timer.timeout.connect(cls._tick)
+        if not cls._timer.isActive():
+            cls._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):  # pragma: no cover - UI interaction
+        cls = type(self)
+        cls._visible.discard(self)
+        if not cls._visible and cls._timer is not None:
+            cls._timer.stop()
+        super().hideEvent(event)
+
+    def paintEvent(self, event):  # pragma: no cover - UI painting
+        w = self.width()
+        # Highlight band sweeps from off the left edge to off the right edge
+        x = self._phase * 2 * w
+        gradient = QLinearGradient(x - w, 0, x, 0)
+        gradient.setColorAt(0.0, QColor("#e5e7eb"))
+        gradient.setColorAt(0.5, QColor("#f3f4f6"))
+        gradient.setColorAt(1.0, QColor("#e5e7eb"))
+        painter = QPainter(self)
+        try:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(gradient)
+            painter.drawRoundedRect(self.rect(), 6, 6)
+        finally:
+            painter.end()